@@ -14,6 +14,9 @@ class MCPConfig:
     max_rows_absolute: int = 5000
     enable_query_logging: bool = False
     strict_validation: bool = True
+    schema_cache_ttl: float = 60.0
+    pool_size: int = 4
+    auto_index: bool = True
     transport: str = "stdio"
     host: str = "127.0.0.1"
     port: int = 8000
@@ -48,6 +51,12 @@ class MCPConfig:
                 f"max_rows ({self.max_rows}) cannot exceed max_rows_absolute ({self.max_rows_absolute})"
             )
 
+        if self.pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        if self.schema_cache_ttl < 0:
+            raise ValueError("schema_cache_ttl cannot be negative")
+
         if self.transport not in ("stdio", "http", "sse"):
             raise ValueError(f"Invalid transport: {self.transport}")
 
@@ -4,49 +4,93 @@ Provides secure, read-only access to journal tracking data
 through the Model Context Protocol with tools for LLM understanding.
 """
 
-import json
 import os
+import queue
 import re
 import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 try:
     from fastmcp import FastMCP
+    from fastmcp.tools import Tool
 except ImportError:
     raise ImportError(
         "FastMCP is required for MCP server functionality. "
         "Install with: pip install fastmcp"
     )
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 from .config import MCPConfig
 
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 20000
+
+INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date)",
+    "CREATE INDEX IF NOT EXISTS idx_entries_tracker ON entries(tracker_id)",
+    "CREATE INDEX IF NOT EXISTS idx_trackers_category ON trackers(category) WHERE deleted = 0",
+)
 
-class SQLiteConnection:
-    """Secure SQLite connection context manager for read-only access."""
+_IDENT_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+_LIMIT_RE = re.compile(r"\blimit\b", re.IGNORECASE)
+_LIMIT_TAIL_LENGTH = 64
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
-    def __init__(self, db_path: Path):
-        self.db_path = db_path
-        self.conn = None
+# Quoted strings are consumed whole (unterminated ones run to the end), so
+# any bare ";" match is a statement separator outside of quotes.
+_STATEMENT_SCAN_RE = re.compile(r"""'[^']*'?|"[^"]*"?|;""")
 
-    def __enter__(self):
-        """Open read-only SQLite connection."""
-        self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
-        self.conn.row_factory = sqlite3.Row
-        return self.conn
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Close connection safely."""
-        if self.conn:
-            self.conn.close()
+def open_readonly_connection(db_path: Path) -> sqlite3.Connection:
+    """Open a read-only SQLite connection tuned for repeated queries."""
+    conn = sqlite3.connect(
+        f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = 1")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    return conn
+
+
+def ensure_indexes(db_path: Path) -> None:
+    """Create the indexes the journal tools rely on, if they are missing.
+
+    Uses a short-lived writable connection; failures (e.g. a read-only file or
+    a missing table) are ignored since indexes only affect performance.
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+    except sqlite3.Error:
+        return
+
+    try:
+        for statement in INDEX_STATEMENTS:
+            try:
+                conn.execute(statement)
+            except sqlite3.Error:
+                pass
+        conn.commit()
+    finally:
+        conn.close()
 
 
 class QueryValidator:
     """SQL query validation and sanitization for read-only access."""
 
     ALLOWED_STATEMENTS = ("select", "with")
-    FORBIDDEN_KEYWORDS = {
+    FORBIDDEN_KEYWORDS = frozenset({
         "insert",
         "update",
         "delete",
@@ -58,51 +102,58 @@ class QueryValidator:
         "detach",
         "vacuum",
         "analyze",
-    }
+    })
+    _PREFIX_LENGTH = max(len(prefix) for prefix in ALLOWED_STATEMENTS)
+    _FORBIDDEN_RE = re.compile(
+        r"\b(?:" + "|".join(sorted(FORBIDDEN_KEYWORDS)) + r")\b", re.IGNORECASE
+    )
 
     @classmethod
     def validate_query(cls, query: str) -> None:
         """Validate SQL query for read-only access."""
-        if not query or not query.strip():
+        if not query or query.isspace():
             raise ValueError("Query cannot be empty")
 
-        query_lower = query.lower().strip()
+        start = 0
+        while query[start].isspace():
+            start += 1
+        head = query[start:start + cls._PREFIX_LENGTH].lower()
 
-        if not any(query_lower.startswith(prefix) for prefix in cls.ALLOWED_STATEMENTS):
+        if not head.startswith(cls.ALLOWED_STATEMENTS):
             allowed = ", ".join(cls.ALLOWED_STATEMENTS).upper()
             raise ValueError(f"Only {allowed} queries are allowed for security")
 
-        query_words = set(re.findall(r"\b\w+\b", query_lower))
-        forbidden_found = query_words.intersection(cls.FORBIDDEN_KEYWORDS)
-        if forbidden_found:
-            raise ValueError(f"Forbidden keywords found: {', '.join(forbidden_found)}")
+        cls._scan_sql(query)
 
-        if cls._contains_multiple_statements(query):
-            raise ValueError("Multiple statements not allowed")
-
-    @staticmethod
-    def _contains_multiple_statements(sql: str) -> bool:
-        """Check if SQL contains multiple statements."""
-        in_single_quote = False
-        in_double_quote = False
+    @classmethod
+    def _scan_sql(cls, sql: str) -> None:
+        """Check for forbidden keywords and statement separators.
 
-        for char in sql:
-            if char == "'" and not in_double_quote:
-                in_single_quote = not in_single_quote
-            elif char == '"' and not in_single_quote:
-                in_double_quote = not in_double_quote
-            elif char == ";" and not in_single_quote and not in_double_quote:
-                return True
+        Keywords are matched as whole words wherever they appear, stopping at
+        the first hit, while semicolons only count outside of quoted strings.
+        """
+        match = cls._FORBIDDEN_RE.search(sql)
+        if match is not None:
+            raise ValueError(f"Forbidden keyword: {match.group().lower()}")
 
-        return False
+        if ";" in sql and any(
+            match.group() == ";" for match in _STATEMENT_SCAN_RE.finditer(sql)
+        ):
+            raise ValueError("Multiple statements not allowed")
 
     @staticmethod
     def add_row_limit(query: str, limit: int = 1000) -> str:
-        """Add LIMIT clause if not present."""
-        query_lower = query.lower()
-        if "limit" not in query_lower:
-            return f"{query.rstrip(';')} LIMIT {limit}"
-        return query
+        """Add LIMIT clause if not present.
+
+        LIMIT almost always closes the query, so the tail is searched first
+        and the rest of the query only when the tail has no match.
+        """
+        tail_start = max(0, len(query) - _LIMIT_TAIL_LENGTH)
+        if _LIMIT_RE.search(query, tail_start) is not None:
+            return query
+        if tail_start and _LIMIT_RE.search(query) is not None:
+            return query
+        return f"{query.rstrip(';')} LIMIT {limit}"
 
 
 class DatabaseManager:
@@ -111,375 +162,537 @@ class DatabaseManager:
     def __init__(self, config: MCPConfig):
         self.config = config
         self.validator = QueryValidator()
+        self._cache: Dict[Any, Tuple[Tuple[int, ...], float, Any]] = {}
+        if config.auto_index:
+            ensure_indexes(config.db_path)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._pool_lock = threading.Lock()
+        self._opened = 0
+
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool.
+
+        Sync tools run in a threadpool; each call gets its own connection so
+        concurrent readers do not serialize on one another. Connections are
+        opened on demand up to config.pool_size, after which callers wait for
+        one to be returned.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
 
-    def get_connection(self):
-        """Get read-only database connection."""
-        return SQLiteConnection(self.config.db_path)
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, open a new one under the cap, or wait."""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if self._opened < self.config.pool_size:
+                conn = open_readonly_connection(self.config.db_path)
+                self._opened += 1
+                return conn
+        return self._pool.get()
+
+    def close(self) -> None:
+        """Close idle pooled connections; later calls open new ones as needed."""
+        with self._pool_lock:
+            while True:
+                try:
+                    conn = self._pool.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._opened -= 1
+
+    def _db_stamp(self) -> Tuple[int, ...]:
+        """Modification stamp of the database file and its WAL, if any."""
+        stamp = [self.config.db_path.stat().st_mtime_ns]
+        wal_path = self.config.db_path.with_name(self.config.db_path.name + "-wal")
+        if wal_path.exists():
+            stamp.append(wal_path.stat().st_mtime_ns)
+        return tuple(stamp)
+
+    def cached(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return a cached result, recomputing it when stale or the database changed."""
+        stamp = self._db_stamp()
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and entry[0] == stamp and now - entry[1] < self.config.schema_cache_ttl:
+            return entry[2]
+
+        value = compute()
+        self._cache[key] = (stamp, now, value)
+        return value
+
+    def _prepare_query(self, query: str) -> str:
+        """Validate query and apply the configured row limit."""
+        if self.config.strict_validation:
+            self.validator.validate_query(query)
+
+        return self.validator.add_row_limit(query, self.config.max_rows)
 
     def execute_safe_query(
         self, query: str, params: Optional[List[Any]] = None
     ) -> List[Dict[str, Any]]:
         """Execute validated query with safety checks."""
-        if self.config.strict_validation:
-            self.validator.validate_query(query)
+        query = self._prepare_query(query)
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(query, params) if params else conn.execute(query)
+                cursor.row_factory = None
+                # Tool results are validated and serialized by FastMCP through
+                # pydantic, which needs plain dicts; build exactly one per row
+                # straight from the tuple instead of going through sqlite3.Row.
+                columns = [col[0] for col in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor]
+        except sqlite3.Error as e:
+            raise ValueError(f"Database error: {str(e)}")
 
-        query = self.validator.add_row_limit(query, self.config.max_rows)
+    def execute_safe_query_one(
+        self, query: str, params: Optional[List[Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Execute validated query and return only its first row."""
+        query = self._prepare_query(query)
 
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params or [])
-                results = [dict(row) for row in cursor.fetchall()]
-                return results
+                cursor = conn.execute(query, params) if params else conn.execute(query)
+                cursor.row_factory = None
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                return dict(zip([col[0] for col in cursor.description], row))
         except sqlite3.Error as e:
             raise ValueError(f"Database error: {str(e)}")
 
+    def get_row_counts(
+        self, table_names: List[str], exact: bool = False
+    ) -> Dict[str, int]:
+        """Get row counts per table, estimated unless exact counts are requested.
 
-def create_mcp_server(config: Optional[MCPConfig] = None) -> FastMCP:
-    """Create and configure the Journal MCP server."""
-    if config is None:
-        if "JOURNAL_DB_PATH" not in os.environ:
-            raise ValueError("JOURNAL_DB_PATH environment variable must be set")
+        Estimates come from sqlite_stat1 when ANALYZE has been run, otherwise
+        from MAX(rowid), both of which avoid a full table scan.
+        """
+        if exact:
+            return {
+                name: self.execute_safe_query_one(
+                    f"SELECT COUNT(*) as count FROM {name}"
+                )["count"]
+                for name in table_names
+            }
 
-        db_path = Path(os.environ["JOURNAL_DB_PATH"])
-        config = MCPConfig.from_db_path(db_path)
+        # A table has one sqlite_stat1 row per index, and the leading count of a
+        # partial index covers only its own rows, so take the largest
+        estimates: Dict[str, int] = {}
+        try:
+            for row in self.execute_safe_query(
+                "SELECT tbl, MAX(CAST(stat AS INTEGER)) as count FROM sqlite_stat1 GROUP BY tbl"
+            ):
+                estimates[row["tbl"]] = row["count"]
+        except ValueError:
+            pass  # No sqlite_stat1 table until ANALYZE has been run
+
+        counts = {}
+        for name in table_names:
+            if name in estimates:
+                counts[name] = estimates[name]
+                continue
+            try:
+                row = self.execute_safe_query_one(
+                    f"SELECT MAX(_rowid_) as count FROM {name}"
+                )
+            except ValueError:
+                row = self.execute_safe_query_one(f"SELECT COUNT(*) as count FROM {name}")
+            counts[name] = row["count"] or 0
+        return counts
+
+
+_LIST_TRACKERS_SELECT = (
+    "SELECT id, name, category, type, meta_json, deleted FROM trackers"
+)
+_LIST_TRACKERS_ORDER = " ORDER BY category, name"
+
+# Keyed by (include_deleted, filter_by_category) so each filter combination
+# always issues the same statement text.
+_LIST_TRACKERS_QUERIES = {
+    (True, False): _LIST_TRACKERS_SELECT + _LIST_TRACKERS_ORDER,
+    (True, True): _LIST_TRACKERS_SELECT + " WHERE category = ?" + _LIST_TRACKERS_ORDER,
+    (False, False): _LIST_TRACKERS_SELECT + " WHERE deleted = 0" + _LIST_TRACKERS_ORDER,
+    (False, True): (
+        _LIST_TRACKERS_SELECT + " WHERE category = ? AND deleted = 0" + _LIST_TRACKERS_ORDER
+    ),
+}
+
+
+def explore_database_structure(
+    db_manager: DatabaseManager, exact_counts: bool = False
+) -> Dict[str, Any]:
+    """WHEN TO USE: When you need to understand what journal data is available.
+
+    This is your starting point for exploring journal data. Use this tool first
+    to see what tables are available before running specific queries.
+
+    Args:
+        exact_counts: Count every row instead of using fast estimates (default: False)
+
+    Returns:
+        Complete database structure with table descriptions and row counts
+    """
+    def load_structure() -> Dict[str, Any]:
+        tables_query = """
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name NOT LIKE 'sqlite_%'
+            ORDER BY name
+        """
+        tables = db_manager.execute_safe_query(tables_query)
+        table_names = [row["name"] for row in tables]
 
-    config.validate()
-    db_manager = DatabaseManager(config)
-    mcp = FastMCP("Journal Data Explorer")
+        row_counts = db_manager.get_row_counts(table_names, exact=exact_counts)
+
+        table_info = {}
+        for table_name in table_names:
+            table_info[table_name] = {
+                "row_count": row_counts[table_name],
+                "description": _get_table_description(table_name),
+            }
 
-    @mcp.tool()
-    def explore_database_structure() -> Dict[str, Any]:
-        """WHEN TO USE: When you need to understand what journal data is available.
+        return {
+            "available_tables": table_info,
+            "row_counts": "exact" if exact_counts else "estimated",
+            "usage_tip": "Use 'list_trackers' to see available trackers, 'get_entries' to get journal entries, or 'execute_sql_query' for custom queries",
+        }
 
-        This is your starting point for exploring journal data. Use this tool first
-        to see what tables are available before running specific queries.
+    try:
+        return db_manager.cached(("structure", exact_counts), load_structure)
+    except Exception as e:
+        raise ValueError(f"Failed to explore database: {str(e)}")
 
-        Returns:
-            Complete database structure with table descriptions and row counts
-        """
-        try:
-            tables_query = """
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name NOT LIKE 'sqlite_%'
-                ORDER BY name
-            """
-            tables = db_manager.execute_safe_query(tables_query)
-            table_names = [row["name"] for row in tables]
-
-            table_info = {}
-            for table_name in table_names:
-                count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-                count_result = db_manager.execute_safe_query(count_query)
-
-                table_info[table_name] = {
-                    "row_count": count_result[0]["count"],
-                    "description": _get_table_description(table_name),
-                }
 
-            return {
-                "available_tables": table_info,
-                "usage_tip": "Use 'list_trackers' to see available trackers, 'get_entries' to get journal entries, or 'execute_sql_query' for custom queries",
-            }
-        except Exception as e:
-            raise ValueError(f"Failed to explore database: {str(e)}")
+def get_table_details(db_manager: DatabaseManager, table_name: str) -> Dict[str, Any]:
+    """WHEN TO USE: When you need to see the structure and sample data of a specific table.
 
-    @mcp.tool()
-    def get_table_details(table_name: str) -> Dict[str, Any]:
-        """WHEN TO USE: When you need to see the structure and sample data of a specific table.
+    Use this after 'explore_database_structure' when you want to understand what columns
+    are available in a table and see examples of the actual data.
 
-        Use this after 'explore_database_structure' when you want to understand what columns
-        are available in a table and see examples of the actual data.
+    Args:
+        table_name: Name of the table (e.g., 'trackers', 'entries')
 
-        Args:
-            table_name: Name of the table (e.g., 'trackers', 'entries')
+    Returns:
+        Table structure with columns, data types, and sample records
+    """
+    if not table_name or not table_name.strip():
+        raise ValueError("Table name cannot be empty")
 
-        Returns:
-            Table structure with columns, data types, and sample records
+    if not _IDENT_RE.match(table_name):
+        raise ValueError("Invalid table name format")
+
+    def load_details() -> Dict[str, Any]:
+        check_query = """
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
         """
-        if not table_name or not table_name.strip():
-            raise ValueError("Table name cannot be empty")
+        check_result = db_manager.execute_safe_query(check_query, [table_name])
+
+        if not check_result:
+            available_tables = db_manager.execute_safe_query(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+            table_list = [row["name"] for row in available_tables]
+            raise ValueError(
+                f"Table '{table_name}' does not exist. Available tables: {', '.join(table_list)}"
+            )
+
+        schema_query = f"PRAGMA table_info({table_name})"
+        with db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(schema_query)
+            columns = cursor.fetchall()
+
+        column_info = [
+            {
+                "name": col[1],
+                "type": col[2],
+                "required": bool(col[3]),
+                "is_primary_key": bool(col[5]),
+            }
+            for col in columns
+        ]
 
-        if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", table_name):
-            raise ValueError("Invalid table name format")
+        sample_query = f"SELECT * FROM {table_name} ORDER BY rowid DESC LIMIT 3"
+        sample_data = db_manager.execute_safe_query(sample_query)
 
-        try:
-            check_query = """
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name=?
-            """
-            check_result = db_manager.execute_safe_query(check_query, [table_name])
-
-            if not check_result:
-                available_tables = db_manager.execute_safe_query(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
-                )
-                table_list = [row["name"] for row in available_tables]
-                raise ValueError(
-                    f"Table '{table_name}' does not exist. Available tables: {', '.join(table_list)}"
-                )
+        return {
+            "table_name": table_name,
+            "columns": column_info,
+            "sample_data": sample_data,
+            "description": _get_table_description(table_name),
+        }
 
-            schema_query = f"PRAGMA table_info({table_name})"
-            with db_manager.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(schema_query)
-                columns = cursor.fetchall()
-
-            column_info = [
-                {
-                    "name": col[1],
-                    "type": col[2],
-                    "required": bool(col[3]),
-                    "is_primary_key": bool(col[5]),
-                }
-                for col in columns
-            ]
-
-            sample_query = f"SELECT * FROM {table_name} ORDER BY rowid DESC LIMIT 3"
-            sample_data = db_manager.execute_safe_query(sample_query)
+    try:
+        return db_manager.cached(("table_details", table_name), load_details)
+    except Exception as e:
+        raise ValueError(f"Failed to get table details: {str(e)}")
 
-            return {
-                "table_name": table_name,
-                "columns": column_info,
-                "sample_data": sample_data,
-                "description": _get_table_description(table_name),
-            }
 
-        except Exception as e:
-            raise ValueError(f"Failed to get table details: {str(e)}")
+def execute_sql_query(
+    db_manager: DatabaseManager, query: str, params: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
+    """WHEN TO USE: When you need to get specific data using SQL queries.
 
-    @mcp.tool()
-    def execute_sql_query(
-        query: str, params: Optional[List[Any]] = None
-    ) -> List[Dict[str, Any]]:
-        """WHEN TO USE: When you need to get specific data using SQL queries.
+    This is the main tool for querying any data from the database. Use it to run SELECT queries
+    to analyze trackers, entries, or find patterns.
 
-        This is the main tool for querying any data from the database. Use it to run SELECT queries
-        to analyze trackers, entries, or find patterns.
+    IMPORTANT: Only SELECT and WITH queries are allowed for security.
 
-        IMPORTANT: Only SELECT and WITH queries are allowed for security.
+    Args:
+        query: SQL SELECT query
+        params: Optional list of parameters for ? placeholders in query
 
-        Args:
-            query: SQL SELECT query
-            params: Optional list of parameters for ? placeholders in query
+    Example queries:
+    - All trackers: "SELECT id, name, category, type FROM trackers WHERE deleted = 0"
+    - Entries for a date: "SELECT * FROM entries WHERE date = '2026-01-22'"
+    - Join trackers and entries: "SELECT t.name, e.date, e.value, e.completed FROM entries e JOIN trackers t ON e.tracker_id = t.id"
 
-        Example queries:
-        - All trackers: "SELECT id, name, category, type FROM trackers WHERE deleted = 0"
-        - Entries for a date: "SELECT * FROM entries WHERE date = '2026-01-22'"
-        - Join trackers and entries: "SELECT t.name, e.date, e.value, e.completed FROM entries e JOIN trackers t ON e.tracker_id = t.id"
+    Returns:
+        List of matching records as dictionaries
+    """
+    if not query or not query.strip():
+        raise ValueError("Query cannot be empty")
 
-        Returns:
-            List of matching records as dictionaries
-        """
-        if not query or not query.strip():
-            raise ValueError("Query cannot be empty")
+    try:
+        return db_manager.execute_safe_query(query, params)
+    except Exception as e:
+        raise ValueError(f"Query execution failed: {str(e)}")
 
-        try:
-            return db_manager.execute_safe_query(query, params)
-        except Exception as e:
-            raise ValueError(f"Query execution failed: {str(e)}")
 
-    @mcp.tool()
-    def list_trackers(
-        category: Optional[str] = None, include_deleted: bool = False
-    ) -> List[Dict[str, Any]]:
-        """WHEN TO USE: When you want to see what trackers are available for journaling.
+def list_trackers(
+    db_manager: DatabaseManager,
+    category: Optional[str] = None,
+    include_deleted: bool = False,
+) -> List[Dict[str, Any]]:
+    """WHEN TO USE: When you want to see what trackers are available for journaling.
 
-        Lists all trackers (habits, metrics, etc.) that can be tracked in the journal.
-        Trackers can be simple checkboxes or quantifiable values.
+    Lists all trackers (habits, metrics, etc.) that can be tracked in the journal.
+    Trackers can be simple checkboxes or quantifiable values.
 
-        Args:
-            category: Optional filter by category (e.g., 'Supplements', 'Habits')
-            include_deleted: Whether to include deleted trackers (default: False)
+    Args:
+        category: Optional filter by category (e.g., 'Supplements', 'Habits')
+        include_deleted: Whether to include deleted trackers (default: False)
 
-        Returns:
-            List of trackers with their details including name, category, type, and metadata
-        """
-        try:
-            query = """
-                SELECT id, name, category, type, meta_json, deleted
-                FROM trackers
-                WHERE 1=1
-            """
-            params = []
-
-            if not include_deleted:
-                query += " AND deleted = 0"
-
-            if category:
-                query += " AND category = ?"
-                params.append(category)
-
-            query += " ORDER BY category, name"
-
-            results = db_manager.execute_safe_query(query, params)
-
-            for row in results:
-                if row.get("meta_json"):
-                    try:
-                        row["metadata"] = json.loads(row["meta_json"])
-                    except json.JSONDecodeError:
-                        row["metadata"] = {}
-                    del row["meta_json"]
-                else:
+    Returns:
+        List of trackers with their details including name, category, type, and metadata
+    """
+    try:
+        query = _LIST_TRACKERS_QUERIES[(include_deleted, bool(category))]
+        params = [category] if category else []
+
+        results = db_manager.execute_safe_query(query, params)
+
+        for row in results:
+            if row.get("meta_json"):
+                try:
+                    row["metadata"] = json_loads(row["meta_json"])
+                except ValueError:
                     row["metadata"] = {}
+                del row["meta_json"]
+            else:
+                row["metadata"] = {}
 
-            return results
-        except Exception as e:
-            raise ValueError(f"Failed to list trackers: {str(e)}")
+        return results
+    except Exception as e:
+        raise ValueError(f"Failed to list trackers: {str(e)}")
+
+
+def get_entries(
+    db_manager: DatabaseManager,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    tracker_name: Optional[str] = None,
+    days: int = 7,
+) -> List[Dict[str, Any]]:
+    """WHEN TO USE: When you want to see journal entries for specific dates or trackers.
+
+    Retrieves journal entries with tracker information. Use this to see what was
+    tracked on specific days, analyze habits, or review progress.
+
+    Args:
+        start_date: Start date in YYYY-MM-DD format (default: days ago from today)
+        end_date: End date in YYYY-MM-DD format (default: today)
+        tracker_name: Optional filter by tracker name (partial match supported)
+        days: Number of days to look back if start_date not specified (default: 7)
+
+    Returns:
+        List of entries with tracker names, dates, values, and completion status
+    """
+    for label, value in (("start_date", start_date), ("end_date", end_date)):
+        if value:
+            if not _DATE_RE.match(value):
+                raise ValueError(f"{label} must be in YYYY-MM-DD format")
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"{label} is not a valid date: {value}")
+
+    if not end_date:
+        end_date = date.today().isoformat()
+    if not start_date:
+        start_date = (date.today() - timedelta(days=days)).isoformat()
+    if start_date > end_date:
+        raise ValueError(f"start_date ({start_date}) is after end_date ({end_date})")
+
+    try:
+        query = """
+            SELECT
+                e.date,
+                t.name as tracker_name,
+                t.category,
+                t.type as tracker_type,
+                e.value,
+                e.completed
+            FROM entries e
+            JOIN trackers t ON e.tracker_id = t.id
+            WHERE e.date >= ? AND e.date <= ?
+            AND (? IS NULL OR t.name LIKE ?)
+            ORDER BY e.date DESC, t.category, t.name
+        """
+        name_pattern = f"%{tracker_name}%" if tracker_name else None
+        params = [start_date, end_date, name_pattern, name_pattern]
+
+        return db_manager.execute_safe_query(query, params)
+    except Exception as e:
+        raise ValueError(f"Failed to get entries: {str(e)}")
 
-    @mcp.tool()
-    def get_entries(
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        tracker_name: Optional[str] = None,
-        days: int = 7,
-    ) -> List[Dict[str, Any]]:
-        """WHEN TO USE: When you want to see journal entries for specific dates or trackers.
 
-        Retrieves journal entries with tracker information. Use this to see what was
-        tracked on specific days, analyze habits, or review progress.
+def get_journal_summary(db_manager: DatabaseManager, days: int = 30) -> Dict[str, Any]:
+    """WHEN TO USE: When you want a quick overview of journal activity without writing SQL.
 
-        Args:
-            start_date: Start date in YYYY-MM-DD format (default: days ago from today)
-            end_date: End date in YYYY-MM-DD format (default: today)
-            tracker_name: Optional filter by tracker name (partial match supported)
-            days: Number of days to look back if start_date not specified (default: 7)
+    Provides summary statistics about journal entries and tracker usage over a period.
 
-        Returns:
-            List of entries with tracker names, dates, values, and completion status
+    Args:
+        days: Number of recent days to analyze (max 365, default: 30)
+
+    Returns:
+        Summary including total entries, completion rates, most used trackers, and active days
+    """
+    if days > 365:
+        raise ValueError("Days cannot exceed 365")
+
+    try:
+        start_date = (date.today() - timedelta(days=days)).isoformat()
+
+        totals_query = """
+            SELECT COUNT(*) as total_entries,
+                   COUNT(CASE WHEN completed = 1 THEN 1 END) as completed,
+                   COUNT(DISTINCT date) as active_days
+            FROM entries
+            WHERE date >= ?
         """
-        try:
-            if not end_date:
-                end_date = date.today().isoformat()
-            if not start_date:
-                start_date = (date.today() - timedelta(days=days)).isoformat()
-
-            query = """
-                SELECT
-                    e.date,
-                    t.name as tracker_name,
-                    t.category,
-                    t.type as tracker_type,
-                    e.value,
-                    e.completed
-                FROM entries e
-                JOIN trackers t ON e.tracker_id = t.id
-                WHERE e.date >= ? AND e.date <= ?
-            """
-            params = [start_date, end_date]
-
-            if tracker_name:
-                query += " AND t.name LIKE ?"
-                params.append(f"%{tracker_name}%")
-
-            query += " ORDER BY e.date DESC, t.category, t.name"
-
-            return db_manager.execute_safe_query(query, params)
-        except Exception as e:
-            raise ValueError(f"Failed to get entries: {str(e)}")
-
-    @mcp.tool()
-    def get_journal_summary(days: int = 30) -> Dict[str, Any]:
-        """WHEN TO USE: When you want a quick overview of journal activity without writing SQL.
-
-        Provides summary statistics about journal entries and tracker usage over a period.
-
-        Args:
-            days: Number of recent days to analyze (max 365, default: 30)
-
-        Returns:
-            Summary including total entries, completion rates, most used trackers, and active days
+        totals = db_manager.execute_safe_query_one(totals_query, [start_date])
+        total_entries = totals["total_entries"]
+        completed = totals["completed"]
+        active_days = totals["active_days"]
+
+        # Aggregated in SQL: summing per-tracker rows in Python would miss
+        # trackers cut off by the max_rows limit on execute_safe_query.
+        category_query = """
+            SELECT t.category, COUNT(*) as entry_count
+            FROM entries e
+            JOIN trackers t ON e.tracker_id = t.id
+            WHERE e.date >= ?
+            GROUP BY t.category
+            ORDER BY entry_count DESC, t.category
         """
-        if days > 365:
-            raise ValueError("Days cannot exceed 365")
+        categories = db_manager.execute_safe_query(category_query, [start_date])
+
+        top_trackers_query = """
+            SELECT t.name, COUNT(*) as entry_count,
+                   SUM(CASE WHEN e.completed = 1 THEN 1 ELSE 0 END) as completed_count
+            FROM entries e
+            JOIN trackers t ON e.tracker_id = t.id
+            WHERE e.date >= ?
+            GROUP BY t.id
+            ORDER BY entry_count DESC, t.name
+            LIMIT 10
+        """
+        top_trackers = db_manager.execute_safe_query(top_trackers_query, [start_date])
+
+        completion_rate = round(completed / total_entries * 100, 1) if total_entries > 0 else 0
+
+        return {
+            "analysis_period_days": days,
+            "total_entries": total_entries,
+            "completed_entries": completed,
+            "completion_rate_percent": completion_rate,
+            "active_days": active_days,
+            "entries_by_category": categories,
+            "top_trackers": top_trackers,
+        }
+    except Exception as e:
+        raise ValueError(f"Failed to generate summary: {str(e)}")
+
+
+TOOLS = (
+    explore_database_structure,
+    get_table_details,
+    execute_sql_query,
+    list_trackers,
+    get_entries,
+    get_journal_summary,
+)
+
+
+def create_mcp_server(config: Optional[MCPConfig] = None) -> FastMCP:
+    """Create and configure the Journal MCP server."""
+    if config is None:
+        if "JOURNAL_DB_PATH" not in os.environ:
+            raise ValueError("JOURNAL_DB_PATH environment variable must be set")
+
+        db_path = Path(os.environ["JOURNAL_DB_PATH"])
+        config = MCPConfig.from_db_path(db_path)
+
+    config.validate()
+    db_manager = DatabaseManager(config)
 
+    @asynccontextmanager
+    async def close_connections(server: FastMCP):
         try:
-            start_date = (date.today() - timedelta(days=days)).isoformat()
-
-            total_query = """
-                SELECT COUNT(*) as total_entries
-                FROM entries
-                WHERE date >= ?
-            """
-            total_result = db_manager.execute_safe_query(total_query, [start_date])
-            total_entries = total_result[0]["total_entries"] if total_result else 0
-
-            completed_query = """
-                SELECT COUNT(*) as completed
-                FROM entries
-                WHERE date >= ? AND completed = 1
-            """
-            completed_result = db_manager.execute_safe_query(completed_query, [start_date])
-            completed = completed_result[0]["completed"] if completed_result else 0
-
-            days_query = """
-                SELECT COUNT(DISTINCT date) as active_days
-                FROM entries
-                WHERE date >= ?
-            """
-            days_result = db_manager.execute_safe_query(days_query, [start_date])
-            active_days = days_result[0]["active_days"] if days_result else 0
-
-            category_query = """
-                SELECT t.category, COUNT(*) as entry_count
-                FROM entries e
-                JOIN trackers t ON e.tracker_id = t.id
-                WHERE e.date >= ?
-                GROUP BY t.category
-                ORDER BY entry_count DESC
-            """
-            categories = db_manager.execute_safe_query(category_query, [start_date])
-
-            top_trackers_query = """
-                SELECT t.name, COUNT(*) as entry_count,
-                       SUM(CASE WHEN e.completed = 1 THEN 1 ELSE 0 END) as completed_count
-                FROM entries e
-                JOIN trackers t ON e.tracker_id = t.id
-                WHERE e.date >= ?
-                GROUP BY t.id, t.name
-                ORDER BY entry_count DESC
-                LIMIT 10
-            """
-            top_trackers = db_manager.execute_safe_query(top_trackers_query, [start_date])
-
-            completion_rate = round(completed / total_entries * 100, 1) if total_entries > 0 else 0
+            yield {}
+        finally:
+            db_manager.close()
 
-            return {
-                "analysis_period_days": days,
-                "total_entries": total_entries,
-                "completed_entries": completed,
-                "completion_rate_percent": completion_rate,
-                "active_days": active_days,
-                "entries_by_category": categories,
-                "top_trackers": top_trackers,
-            }
-        except Exception as e:
-            raise ValueError(f"Failed to generate summary: {str(e)}")
+    mcp = FastMCP("Journal Data Explorer", lifespan=close_connections)
+
+    for tool in TOOLS:
+        mcp.add_tool(Tool.from_function(partial(tool, db_manager)))
 
     @mcp.resource("file://journal_data_guide")
     def journal_data_guide() -> str:
         """Complete guide to understanding and querying journal data."""
-        return _get_journal_data_guide()
+        return _JOURNAL_DATA_GUIDE
 
     return mcp
 
 
+_TABLE_DESCRIPTIONS = {
+    "trackers": "Tracker definitions including habits, supplements, metrics with their categories and types",
+    "entries": "Daily journal entries recording tracker values and completion status",
+    "clients": "Client devices that sync with the journal",
+    "meta_sync": "Sync metadata for client synchronization",
+    "sync_conflicts": "Records of sync conflicts between clients",
+}
+
+
 def _get_table_description(table_name: str) -> str:
     """Get human-readable description for table."""
-    descriptions = {
-        "trackers": "Tracker definitions including habits, supplements, metrics with their categories and types",
-        "entries": "Daily journal entries recording tracker values and completion status",
-        "clients": "Client devices that sync with the journal",
-        "meta_sync": "Sync metadata for client synchronization",
-        "sync_conflicts": "Records of sync conflicts between clients",
-    }
-    return descriptions.get(table_name, "Journal data table")
-
-
-def _get_journal_data_guide() -> str:
-    """Get comprehensive guide for journal data analysis."""
-    return """
+    return _TABLE_DESCRIPTIONS.get(table_name, "Journal data table")
+
+
+_JOURNAL_DATA_GUIDE = """
 # Journal Data Analysis Guide
 
 ## Quick Start
@@ -550,9 +763,11 @@ ORDER BY date DESC
 ## Tips
 - Join entries with trackers to get meaningful names
 - Filter by deleted = 0 to exclude deleted trackers
-- Use date ranges to analyze trends over time
+- Use date ranges to analyze trends over time; entries are indexed by date,
+  so compare against 'YYYY-MM-DD' strings rather than wrapping date in functions
+- Joins on entries.tracker_id and filters on active trackers' category are indexed too
 - Group by category for category-level analysis
-    """.strip()
+""".strip()
 
 
 def main():
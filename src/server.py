@@ -4,16 +4,19 @@ Enhanced with per-record versioning and multi-client sync support
 """
 import json
 import sqlite3
+import stat
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from contextlib import contextmanager, asynccontextmanager
 from typing import Any, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from pydantic import BaseModel, ConfigDict
 
 
@@ -25,12 +28,17 @@ PUBLIC_DIR = PROJECT_ROOT / "public"
 # Cache busting: unique version generated on each server start
 SERVER_VERSION = uuid.uuid4().hex[:8]
 
+# index.html with the version injected, keyed on (path, mtime_ns) so edits
+# to the file are picked up without a restart
+_index_html_cache: dict[tuple[Path, int], str] = {}
+
 @asynccontextmanager
 async def lifespan(app):
     # Startup
     init_database()
     yield
-    # Shutdown (nothing needed)
+    # Shutdown
+    close_db()
 
 
 app = FastAPI(title="Personal Journal Server", lifespan=lifespan)
@@ -42,24 +50,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,  # let browsers reuse the preflight for a day
 )
 
 
 # Database helpers
+_local = threading.local()
+
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 20000
+
+
+def _connect(path):
+    # Connections stay open per thread, so sqlite3's default statement cache
+    # (128 entries, well above the handlers' fixed SQL) parses each once
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    # journal_mode=WAL is stored in the database file by init_database;
+    # these settings only last for the connection
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    return conn
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Context manager for database connections.
+
+    Each thread keeps one open connection to DATABASE_PATH (reopened if the
+    path changes), so requests skip the connect and pragma setup. Work that
+    was not committed is rolled back on exit.
+    """
+    path = DATABASE_PATH
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != path:
+        if conn is not None:
+            conn.close()
+        conn = _local.conn = _connect(path)
+        _local.path = path
     try:
         yield conn
     finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+
+def close_db():
+    """Close the calling thread's cached connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
         conn.close()
+        _local.conn = _local.path = None
 
 
 def init_database():
     """Initialize the database with required tables including versioning."""
     with get_db() as conn:
+        # Persistent: readers keep going while a sync update is writing
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
 
         # clients table - track connected clients
@@ -164,9 +215,53 @@ def init_database():
         conn.commit()
 
 
+# (second, "YYYY-MM-DDTHH:MM:SS") for the most recent get_utc_now() call;
+# stored as one tuple so threadpool callers never see a torn pair
+_utc_second_prefix = (None, "")
+
+
 def get_utc_now() -> str:
     """Return current UTC time as ISO-8601 string."""
-    return datetime.utcnow().isoformat() + "Z"
+    global _utc_second_prefix
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _utc_second_prefix
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _utc_second_prefix = (second, prefix)
+    return f"{prefix}.{nanos // 1000:06d}Z"
+
+
+ENTRY_COLUMNS = "date, tracker_id, value, completed, version, last_modified_by, last_modified_at"
+
+
+def entry_rows_to_days(rows) -> dict[str, dict[str, dict[str, Any]]]:
+    """Group entry rows (selected with ENTRY_COLUMNS) into the client's days[date][tracker_id] shape."""
+    days = {}
+    for date_str, tracker_id, value, completed, version, modified_by, modified_at in rows:
+        days.setdefault(date_str, {})[tracker_id] = {
+            "value": value,
+            "completed": bool(completed) if completed is not None else None,
+            "_version": version or 1,
+            "_lastModifiedBy": modified_by,
+            "_lastModifiedAt": modified_at
+        }
+    return days
+
+
+def tracker_row_to_config(row) -> dict[str, Any]:
+    """Build a client tracker config from a trackers row, merging meta_json in one call."""
+    tracker = {
+        "id": row["id"],
+        "name": row["name"],
+        "category": row["category"],
+        "type": row["type"],
+        "_version": row["version"] or 1,
+        "_lastModifiedBy": row["last_modified_by"],
+        "_lastModifiedAt": row["last_modified_at"]
+    }
+    if row["meta_json"]:
+        tracker.update(json.loads(row["meta_json"]))
+    return tracker
 
 
 # Pydantic models
@@ -189,13 +284,28 @@ class TrackerConfig(BaseModel):
     _deleted: Optional[bool] = False
 
 
+class SyncOperation(BaseModel):
+    config: list[dict[str, Any]] = []
+    days: dict[str, dict[str, dict[str, Any]]] = {}
+
+
 class SyncPayload(BaseModel):
     clientId: str
     config: list[dict[str, Any]] = []
     days: dict[str, dict[str, dict[str, Any]]] = {}
+    operations: Optional[list[SyncOperation]] = None
     lastSyncTime: Optional[str] = None
 
 
+class ClientRegistration(BaseModel):
+    id: str
+    name: Optional[str] = None
+
+
+class BulkRegisterPayload(BaseModel):
+    clients: list[ClientRegistration]
+
+
 class StatusResponse(BaseModel):
     lastModified: Optional[str] = None
 
@@ -258,9 +368,22 @@ def register_client(client_id: str, client_name: Optional[str] = None):
         return {"status": "ok", "clientId": client_id}
 
 
-@app.get("/api/sync/full", response_model=FullSyncResponse)
-def sync_full():
-    """Get full data dump for client synchronization."""
+@app.post("/api/sync/register/bulk")
+def register_clients(payload: BulkRegisterPayload):
+    """Register or update several clients in one transaction."""
+    now = get_utc_now()
+    rows = [(c.id, c.name or f"Client-{c.id[:8]}", now) for c in payload.clients]
+    with get_db() as conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO clients (id, name, last_seen_at)
+            VALUES (?, ?, ?)
+        """, rows)
+        conn.commit()
+        return {"status": "ok", "clientIds": [c.id for c in payload.clients]}
+
+
+def get_full_sync_data() -> dict[str, Any]:
+    """Build the full sync payload (trackers, last 7 days of entries, server time)."""
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -268,54 +391,34 @@ def sync_full():
         cursor.execute("SELECT * FROM trackers WHERE deleted = 0 OR deleted IS NULL")
         tracker_rows = cursor.fetchall()
 
-        config = []
-        for row in tracker_rows:
-            tracker = {
-                "id": row["id"],
-                "name": row["name"],
-                "category": row["category"],
-                "type": row["type"],
-                "_version": row["version"] or 1,
-                "_lastModifiedBy": row["last_modified_by"],
-                "_lastModifiedAt": row["last_modified_at"]
-            }
-            # Merge meta_json fields
-            if row["meta_json"]:
-                meta = json.loads(row["meta_json"])
-                tracker.update(meta)
-            config.append(tracker)
-
-        # Fetch entries for last 7 days with version info
+        config = [tracker_row_to_config(row) for row in tracker_rows]
+
+        # Fetch entries for last 7 days with version info (range scan on idx_entries_date)
         seven_days_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
         cursor.execute(
-            "SELECT * FROM entries WHERE date >= ?",
+            f"SELECT {ENTRY_COLUMNS} FROM entries WHERE date >= ?",
             (seven_days_ago,)
         )
-        entry_rows = cursor.fetchall()
+        days = entry_rows_to_days(cursor)
 
-        # Transform to client format
-        days = {}
-        for row in entry_rows:
-            date_str = row["date"]
-            tracker_id = row["tracker_id"]
+        return {"config": config, "days": days, "serverTime": get_utc_now()}
 
-            if date_str not in days:
-                days[date_str] = {}
 
-            days[date_str][tracker_id] = {
-                "value": row["value"],
-                "completed": bool(row["completed"]) if row["completed"] is not None else None,
-                "_version": row["version"] or 1,
-                "_lastModifiedBy": row["last_modified_by"],
-                "_lastModifiedAt": row["last_modified_at"]
-            }
-
-        return FullSyncResponse(config=config, days=days, serverTime=get_utc_now())
+@app.get("/api/sync/full", response_model=FullSyncResponse)
+def sync_full():
+    """Get full data dump for client synchronization."""
+    return FullSyncResponse(**get_full_sync_data())
 
 
-@app.get("/api/sync/delta")
+@app.get("/api/sync/delta", response_model=DeltaSyncResponse)
 def sync_delta(since: str, client_id: str):
-    """Get changes since a specific timestamp for incremental sync."""
+    """
+    Get changes since a specific timestamp for incremental sync.
+
+    since is not parsed: get_utc_now() stamps are fixed-width UTC strings,
+    so comparing them as text against the indexed last_modified_at columns
+    orders them chronologically.
+    """
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -332,44 +435,16 @@ def sync_delta(since: str, client_id: str):
             if row["deleted"]:
                 deleted_trackers.append(row["id"])
             else:
-                tracker = {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "category": row["category"],
-                    "type": row["type"],
-                    "_version": row["version"] or 1,
-                    "_lastModifiedBy": row["last_modified_by"],
-                    "_lastModifiedAt": row["last_modified_at"]
-                }
-                if row["meta_json"]:
-                    meta = json.loads(row["meta_json"])
-                    tracker.update(meta)
-                config.append(tracker)
+                config.append(tracker_row_to_config(row))
 
         # Fetch entries modified since timestamp (last 7 days only)
         seven_days_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT * FROM entries
+        cursor.execute(f"""
+            SELECT {ENTRY_COLUMNS} FROM entries
             WHERE (last_modified_at > ? OR last_modified_at IS NULL)
             AND date >= ?
         """, (since, seven_days_ago))
-        entry_rows = cursor.fetchall()
-
-        days = {}
-        for row in entry_rows:
-            date_str = row["date"]
-            tracker_id = row["tracker_id"]
-
-            if date_str not in days:
-                days[date_str] = {}
-
-            days[date_str][tracker_id] = {
-                "value": row["value"],
-                "completed": bool(row["completed"]) if row["completed"] is not None else None,
-                "_version": row["version"] or 1,
-                "_lastModifiedBy": row["last_modified_by"],
-                "_lastModifiedAt": row["last_modified_at"]
-            }
+        days = entry_rows_to_days(cursor)
 
         return DeltaSyncResponse(
             config=config,
@@ -381,7 +456,12 @@ def sync_delta(since: str, client_id: str):
 
 @app.post("/api/sync/update", response_model=SyncResponse)
 def sync_update(payload: SyncPayload):
-    """Update server with client data, with conflict detection."""
+    """
+    Update server with client data, with conflict detection.
+
+    payload.operations lets a client send several sequential edits (e.g.
+    create, then update) in one request.
+    """
     conflicts = []
     applied_config = []
     applied_days = {}
@@ -399,140 +479,151 @@ def sync_update(payload: SyncPayload):
         """, (client_id, f"Client-{client_id[:8]}", now))
 
         try:
-            # 1. Process tracker configs with version checking
-            for item in payload.config:
-                tracker_id = item.get("id")
-                client_base_version = item.get("_baseVersion", 0)
-                is_deleted = item.get("_deleted", False)
-
-                # Check current server version
-                cursor.execute(
-                    "SELECT version, name, category, type, meta_json, deleted FROM trackers WHERE id = ?",
-                    (tracker_id,)
-                )
-                row = cursor.fetchone()
-                server_version = row["version"] if row else 0
-
-                # Conflict detection: server was modified by another client
-                if row and server_version > client_base_version:
-                    server_data = {
-                        "id": tracker_id,
-                        "name": row["name"],
-                        "category": row["category"],
-                        "type": row["type"],
-                        "_version": server_version
-                    }
-                    if row["meta_json"]:
-                        server_data.update(json.loads(row["meta_json"]))
-
-                    conflicts.append(ConflictInfo(
-                        entityType="tracker",
-                        entityId=tracker_id,
-                        serverVersion=server_version,
-                        clientBaseVersion=client_base_version,
-                        serverData=server_data
-                    ))
-                    continue
-
-                # No conflict - apply update
-                name = item.get("name")
-                category = item.get("category", "")
-                tracker_type = item.get("type", "simple")
-                new_version = server_version + 1
-
-                # Extract meta_json (all fields except known ones)
-                excluded_keys = {"id", "name", "category", "type", "_version", "_baseVersion",
-                               "_lastModifiedBy", "_lastModifiedAt", "_deleted"}
-                meta = {k: v for k, v in item.items() if k not in excluded_keys}
-
-                if is_deleted:
-                    # Soft delete
-                    cursor.execute("""
-                        UPDATE trackers SET deleted = 1, version = ?,
-                        last_modified_by = ?, last_modified_at = ?
-                        WHERE id = ?
-                    """, (new_version, client_id, now, tracker_id))
-                else:
-                    cursor.execute("""
-                        INSERT INTO trackers (id, name, category, type, meta_json, version,
-                                            last_modified_by, last_modified_at, deleted)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
-                        ON CONFLICT(id) DO UPDATE SET
-                            name = excluded.name,
-                            category = excluded.category,
-                            type = excluded.type,
-                            meta_json = excluded.meta_json,
-                            version = excluded.version,
-                            last_modified_by = excluded.last_modified_by,
-                            last_modified_at = excluded.last_modified_at,
-                            deleted = 0
-                    """, (tracker_id, name, category, tracker_type, json.dumps(meta),
-                          new_version, client_id, now))
-
-                applied_config.append({
-                    **item,
-                    "_version": new_version,
-                    "_lastModifiedBy": client_id,
-                    "_lastModifiedAt": now
-                })
-
-            # 2. Process daily logs with version checking
-            for date_str, trackers_map in payload.days.items():
-                if date_str not in applied_days:
-                    applied_days[date_str] = {}
-
-                for tracker_id, data in trackers_map.items():
-                    client_base_version = data.get("_baseVersion", 0)
-
-                    # Check current server version
-                    cursor.execute(
-                        "SELECT version, value, completed FROM entries WHERE date = ? AND tracker_id = ?",
-                        (date_str, tracker_id)
-                    )
-                    row = cursor.fetchone()
-                    server_version = row["version"] if row else 0
-
-                    # Conflict detection
-                    if row and server_version > client_base_version:
-                        server_data = {
-                            "value": row["value"],
-                            "completed": bool(row["completed"]) if row["completed"] is not None else None,
-                            "_version": server_version
-                        }
-                        conflicts.append(ConflictInfo(
-                            entityType="entry",
-                            entityId=f"{date_str}|{tracker_id}",
-                            serverVersion=server_version,
-                            clientBaseVersion=client_base_version,
-                            serverData=server_data
-                        ))
-                        continue
-
-                    # No conflict - apply update
-                    value = data.get("value")
-                    completed = data.get("completed")
-                    completed_int = 1 if completed else 0 if completed is not None else None
-                    new_version = server_version + 1
-
-                    cursor.execute("""
-                        INSERT INTO entries (date, tracker_id, value, completed, version,
-                                           last_modified_by, last_modified_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(date, tracker_id) DO UPDATE SET
-                            value = excluded.value,
-                            completed = excluded.completed,
-                            version = excluded.version,
-                            last_modified_by = excluded.last_modified_by,
-                            last_modified_at = excluded.last_modified_at
-                    """, (date_str, tracker_id, value, completed_int, new_version, client_id, now))
-
-                    applied_days[date_str][tracker_id] = {
-                        "value": value,
-                        "completed": completed,
+            # The top-level config/days is the first operation; any further
+            # operations are applied after it, in order, in the same transaction
+            for operation in [payload, *(payload.operations or [])]:
+                # 1. Process tracker configs with version checking
+                for item in operation.config:
+                    tracker_id = item.get("id")
+                    client_base_version = item.get("_baseVersion", 0)
+                    is_deleted = item.get("_deleted", False)
+
+                    name = item.get("name")
+                    category = item.get("category", "")
+                    tracker_type = item.get("type", "simple")
+
+                    # Extract meta_json (all fields except known ones)
+                    excluded_keys = {"id", "name", "category", "type", "_version", "_baseVersion",
+                                   "_lastModifiedBy", "_lastModifiedAt", "_deleted"}
+                    meta = {k: v for k, v in item.items() if k not in excluded_keys}
+
+                    # Write only if the server version hasn't moved past the client's
+                    # base version; RETURNING tells us whether the write happened.
+                    if is_deleted:
+                        # Soft delete
+                        cursor.execute("""
+                            UPDATE trackers SET deleted = 1, version = version + 1,
+                            last_modified_by = ?, last_modified_at = ?
+                            WHERE id = ? AND version <= ?
+                            RETURNING version
+                        """, (client_id, now, tracker_id, client_base_version))
+                    else:
+                        cursor.execute("""
+                            INSERT INTO trackers (id, name, category, type, meta_json, version,
+                                                last_modified_by, last_modified_at, deleted)
+                            VALUES (?, ?, ?, ?, ?, 1, ?, ?, 0)
+                            ON CONFLICT(id) DO UPDATE SET
+                                name = excluded.name,
+                                category = excluded.category,
+                                type = excluded.type,
+                                meta_json = excluded.meta_json,
+                                version = trackers.version + 1,
+                                last_modified_by = excluded.last_modified_by,
+                                last_modified_at = excluded.last_modified_at,
+                                deleted = 0
+                            WHERE trackers.version <= ?
+                            RETURNING version
+                        """, (tracker_id, name, category, tracker_type, json.dumps(meta),
+                              client_id, now, client_base_version))
+                    written = cursor.fetchone()
+
+                    if written:
+                        new_version = written["version"]
+                    else:
+                        cursor.execute(
+                            "SELECT version, name, category, type, meta_json, deleted FROM trackers WHERE id = ?",
+                            (tracker_id,)
+                        )
+                        row = cursor.fetchone()
+
+                        # Conflict detection: server was modified by another client
+                        if row:
+                            server_version = row["version"]
+                            server_data = {
+                                "id": tracker_id,
+                                "name": row["name"],
+                                "category": row["category"],
+                                "type": row["type"],
+                                "_version": server_version
+                            }
+                            if row["meta_json"]:
+                                server_data.update(json.loads(row["meta_json"]))
+
+                            conflicts.append(ConflictInfo(
+                                entityType="tracker",
+                                entityId=tracker_id,
+                                serverVersion=server_version,
+                                clientBaseVersion=client_base_version,
+                                serverData=server_data
+                            ))
+                            continue
+
+                        # Deleting a tracker the server never had
+                        new_version = 1
+
+                    applied_config.append({
+                        **item,
                         "_version": new_version,
                         "_lastModifiedBy": client_id,
                         "_lastModifiedAt": now
-                    }
+                    })
+
+                # 2. Process daily logs with version checking
+                for date_str, trackers_map in operation.days.items():
+                    if date_str not in applied_days:
+                        applied_days[date_str] = {}
+
+                    for tracker_id, data in trackers_map.items():
+                        client_base_version = data.get("_baseVersion", 0)
+                        value = data.get("value")
+                        completed = data.get("completed")
+                        completed_int = 1 if completed else 0 if completed is not None else None
+
+                        cursor.execute("""
+                            INSERT INTO entries (date, tracker_id, value, completed, version,
+                                               last_modified_by, last_modified_at)
+                            VALUES (?, ?, ?, ?, 1, ?, ?)
+                            ON CONFLICT(date, tracker_id) DO UPDATE SET
+                                value = excluded.value,
+                                completed = excluded.completed,
+                                version = entries.version + 1,
+                                last_modified_by = excluded.last_modified_by,
+                                last_modified_at = excluded.last_modified_at
+                            WHERE entries.version <= ?
+                            RETURNING version
+                        """, (date_str, tracker_id, value, completed_int, client_id, now,
+                              client_base_version))
+                        written = cursor.fetchone()
+
+                        # Conflict detection
+                        if not written:
+                            cursor.execute(
+                                "SELECT version, value, completed FROM entries WHERE date = ? AND tracker_id = ?",
+                                (date_str, tracker_id)
+                            )
+                            row = cursor.fetchone()
+                            server_version = row["version"]
+                            server_data = {
+                                "value": row["value"],
+                                "completed": bool(row["completed"]) if row["completed"] is not None else None,
+                                "_version": server_version
+                            }
+                            conflicts.append(ConflictInfo(
+                                entityType="entry",
+                                entityId=f"{date_str}|{tracker_id}",
+                                serverVersion=server_version,
+                                clientBaseVersion=client_base_version,
+                                serverData=server_data
+                            ))
+                            continue
+
+                        applied_days[date_str][tracker_id] = {
+                            "value": value,
+                            "completed": completed,
+                            "_version": written["version"],
+                            "_lastModifiedBy": client_id,
+                            "_lastModifiedAt": now
+                        }
 
             # 3. Update sync time only if no conflicts
             if not conflicts:
@@ -560,14 +651,34 @@ def sync_update(payload: SyncPayload):
 @app.post("/api/sync/resolve-conflict")
 def resolve_conflict(
     entity_type: str,
-    entity_id: str,
     resolution: str,  # 'client' or 'server'
     client_id: str,
+    entity_id: Optional[str] = None,
+    entity_date: Optional[str] = None,
+    entity_tracker_id: Optional[str] = None,
     client_data: Optional[dict[str, Any]] = None
 ):
-    """Resolve a specific conflict by choosing client or server version."""
+    """
+    Resolve a specific conflict by choosing client or server version.
+
+    Trackers are identified by entity_id. Entries are identified by
+    entity_date and entity_tracker_id; the older "date|tracker_id" form of
+    entity_id is still accepted.
+    """
     now = get_utc_now()
 
+    if entity_type == "entry":
+        if entity_date is None or entity_tracker_id is None:
+            parts = entity_id.split("|") if entity_id is not None else []
+            if len(parts) != 2:
+                raise HTTPException(status_code=422,
+                                    detail="entity_date and entity_tracker_id are required")
+            entity_date, entity_tracker_id = parts
+        # Conflicts are logged and reported under the combined id
+        entity_id = f"{entity_date}|{entity_tracker_id}"
+    elif entity_id is None:
+        raise HTTPException(status_code=422, detail="entity_id is required")
+
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -593,7 +704,7 @@ def resolve_conflict(
                       new_version, client_id, now))
 
             elif entity_type == "entry":
-                date_str, tracker_id = entity_id.split("|")
+                date_str, tracker_id = entity_date, entity_tracker_id
                 cursor.execute(
                     "SELECT version FROM entries WHERE date = ? AND tracker_id = ?",
                     (date_str, tracker_id)
@@ -658,49 +769,72 @@ def get_unresolved_conflicts(client_id: str):
 
 
 # PWA asset serving
+def file_response(request: Request, path: Path, media_type: str, headers: dict[str, str],
+                  not_found: str):
+    """
+    FileResponse for path, or an empty 304 when the request's If-None-Match
+    already names the file's current ETag (so no-cache assets revalidate
+    without resending the body). Raises a 404 with the not_found detail
+    when path is not a regular file; the one stat() call serves both checks.
+    """
+    try:
+        stat_result = path.stat()
+    except OSError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail=not_found)
+
+    response = FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+    etag = response.headers["etag"]
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    return response
+
+
 @app.get("/manifest.json")
-def serve_manifest():
+def serve_manifest(request: Request):
     """Serve the PWA manifest."""
     manifest_path = PUBLIC_DIR / "manifest.json"
-    if manifest_path.exists():
-        return FileResponse(
-            manifest_path,
-            media_type="application/manifest+json",
-            headers={"Cache-Control": "no-cache, must-revalidate"}
-        )
-    raise HTTPException(status_code=404, detail="manifest.json not found")
+    return file_response(
+        request,
+        manifest_path,
+        media_type="application/manifest+json",
+        headers={"Cache-Control": "no-cache, must-revalidate"},
+        not_found="manifest.json not found"
+    )
 
 
 @app.get("/sw.js")
-def serve_sw():
+def serve_sw(request: Request):
     """Serve the service worker from root scope."""
     sw_path = PUBLIC_DIR / "sw.js"
-    if sw_path.exists():
-        return FileResponse(
-            sw_path,
-            media_type="application/javascript",
-            headers={
-                "Cache-Control": "no-cache, must-revalidate",
-                "Service-Worker-Allowed": "/"
-            }
-        )
-    raise HTTPException(status_code=404, detail="sw.js not found")
+    return file_response(
+        request,
+        sw_path,
+        media_type="application/javascript",
+        headers={
+            "Cache-Control": "no-cache, must-revalidate",
+            "Service-Worker-Allowed": "/"
+        },
+        not_found="sw.js not found"
+    )
 
 
 @app.get("/icons/{file_path:path}")
-def serve_icons(file_path: str):
+def serve_icons(request: Request, file_path: str):
     """Serve PWA icon files."""
     icon_path = PUBLIC_DIR / "icons" / file_path
-    if icon_path.exists() and icon_path.is_file():
-        media_type = "image/png"
-        if file_path.endswith(".svg"):
-            media_type = "image/svg+xml"
-        return FileResponse(
-            icon_path,
-            media_type=media_type,
-            headers={"Cache-Control": "public, max-age=86400"}
-        )
-    raise HTTPException(status_code=404, detail=f"Icon not found: {file_path}")
+    media_type = "image/png"
+    if file_path.endswith(".svg"):
+        media_type = "image/svg+xml"
+    return file_response(
+        request,
+        icon_path,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=86400"},
+        not_found=f"Icon not found: {file_path}"
+    )
 
 
 # Static file serving
@@ -708,13 +842,19 @@ def serve_icons(file_path: str):
 def serve_root():
     """Serve the main index.html with cache-busting version injected."""
     index_path = PUBLIC_DIR / "index.html"
-    if not index_path.exists():
+    try:
+        cache_key = (index_path, index_path.stat().st_mtime_ns)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="index.html not found")
 
-    # Read and inject version into static file URLs
-    html = index_path.read_text()
-    html = html.replace('href="/styles.css"', f'href="/styles.css?v={SERVER_VERSION}"')
-    html = html.replace('src="/js/app.js"', f'src="/js/app.js?v={SERVER_VERSION}"')
+    html = _index_html_cache.get(cache_key)
+    if html is None:
+        # Read and inject version into static file URLs
+        html = index_path.read_text()
+        html = html.replace('href="/styles.css"', f'href="/styles.css?v={SERVER_VERSION}"')
+        html = html.replace('src="/js/app.js"', f'src="/js/app.js?v={SERVER_VERSION}"')
+        _index_html_cache.clear()
+        _index_html_cache[cache_key] = html
 
     return HTMLResponse(
         content=html,
@@ -723,29 +863,29 @@ def serve_root():
 
 
 @app.get("/styles.css")
-def serve_css():
+def serve_css(request: Request):
     """Serve the stylesheet with no-cache headers."""
     css_path = PUBLIC_DIR / "styles.css"
-    if css_path.exists():
-        return FileResponse(
-            css_path,
-            media_type="text/css",
-            headers={"Cache-Control": "no-cache, must-revalidate"}
-        )
-    raise HTTPException(status_code=404, detail="styles.css not found")
+    return file_response(
+        request,
+        css_path,
+        media_type="text/css",
+        headers={"Cache-Control": "no-cache, must-revalidate"},
+        not_found="styles.css not found"
+    )
 
 
 @app.get("/js/{file_path:path}")
-def serve_js(file_path: str):
+def serve_js(request: Request, file_path: str):
     """Serve JavaScript files with no-cache headers."""
     js_path = PUBLIC_DIR / "js" / file_path
-    if js_path.exists() and js_path.is_file():
-        return FileResponse(
-            js_path,
-            media_type="application/javascript",
-            headers={"Cache-Control": "no-cache, must-revalidate"}
-        )
-    raise HTTPException(status_code=404, detail=f"JS file not found: {file_path}")
+    return file_response(
+        request,
+        js_path,
+        media_type="application/javascript",
+        headers={"Cache-Control": "no-cache, must-revalidate"},
+        not_found=f"JS file not found: {file_path}"
+    )
 
 
 if __name__ == "__main__":
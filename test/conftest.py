@@ -1,32 +1,153 @@
 """
 Shared fixtures for all tests.
+
+Every database lives in a per-test (or per-worker) temporary path, so the
+suite can be spread across processes with ``pytest -n auto``. Adding
+``--dist loadfile`` keeps each module on one worker, so its module-scoped
+database templates are built once rather than once per worker.
 """
 import os
+import shutil
+import sqlite3
 import sys
 import tempfile
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
+import httpx
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
-# Add src to path for imports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Add src to path for imports. Fixtures and tests import server inside
+# their bodies or take the srv fixture, so collecting (or deselecting)
+# tests never imports the app.
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+REGISTERED_CLIENT_ID = "test-client-001"
+
+CLIENT_POOL = tuple(f"pool-{i}" for i in range(8))
+
+SAMPLE_TRACKER = {
+    "id": "tracker-001",
+    "name": "Water Intake",
+    "category": "health",
+    "type": "quantifiable",
+    "unit": "glasses",
+    "goal": 8,
+    "_baseVersion": 0
+}
+
+
+SHM_BASETEMP = pytest.StashKey[str]()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Put tmp_path, and so every test database, on RAM-backed storage when
+    # the system has it. Runs before the tmp_path plugin reads basetemp; an
+    # explicit --basetemp wins, and pytest-xdist workers are handed
+    # subdirectories of the controller's basetemp.
+    if config.option.basetemp is None and os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        config.option.basetemp = config.stash[SHM_BASETEMP] = tempfile.mkdtemp(
+            prefix="journal-tests-", dir="/dev/shm"
+        )
+
+
+def pytest_unconfigure(config):
+    if SHM_BASETEMP in config.stash:
+        shutil.rmtree(config.stash[SHM_BASETEMP], ignore_errors=True)
+
+
+def copy_database(src, dst):
+    """
+    Copy a template database into dst with SQLite's backup API, so rows
+    still in the template's WAL file are included and connections already
+    open on dst see the new contents.
+    """
+    source, target = sqlite3.connect(src), sqlite3.connect(dst)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+class ORJSONClientMixin:
+    """Encode json= request bodies with orjson when it is installed."""
+
+    def request(self, method, url, *, json=None, **kwargs):
+        if json is not None and orjson is not None:
+            kwargs["content"] = orjson.dumps(json)
+            kwargs["headers"] = {"content-type": "application/json", **(kwargs.get("headers") or {})}
+        elif json is not None:
+            kwargs["json"] = json
+        return super().request(method, url, **kwargs)
+
+
+class ORJSONTestClient(ORJSONClientMixin, TestClient):
+    pass
+
+
+class ORJSONAsyncClient(ORJSONClientMixin, httpx.AsyncClient):
+    pass
+
+
+@pytest.fixture(scope="session", autouse=True)
+def orjson_responses():
+    """Decode response bodies with orjson when it is installed."""
+    if orjson is None:
+        yield
+        return
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(httpx.Response, "json", lambda self, **kwargs: orjson.loads(self.content))
+        yield
+
 
 @pytest.fixture(scope="function")
-def temp_db_path():
-    """Create a temporary database file for each test."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
-    yield Path(db_path)
-    # Cleanup after test
-    if os.path.exists(db_path):
-        os.unlink(db_path)
+def temp_db_path(tmp_path):
+    """
+    Database file for each test, inside pytest's tmp_path. That directory
+    is unique per test and per xdist worker, and pytest prunes it along
+    with the WAL and shared-memory files SQLite leaves next to the database.
+    """
+    return tmp_path / "journal.db"
+
+
+@pytest.fixture(scope="session")
+def srv():
+    """The server module, imported once for the session."""
+    import server
+    return server
+
+
+@pytest.fixture(scope="session")
+def schema_template(tmp_path_factory):
+    """Empty database initialized by server.init_database, built once per run."""
+    import server
+
+    db_path = tmp_path_factory.mktemp("schema") / "journal.db"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(server, "DATABASE_PATH", db_path)
+        server.init_database()
+    return db_path
+
+
+@pytest.fixture(scope="module")
+def schema_conn(schema_template):
+    """Read-only connection to the schema template, shared by a module's schema checks."""
+    conn = sqlite3.connect(f"file:{schema_template}?mode=ro", uri=True)
+    yield conn
+    conn.close()
 
 
 @pytest.fixture(scope="function")
-def test_app(temp_db_path, tmp_path, monkeypatch):
+def test_app(temp_db_path, tmp_path, monkeypatch, schema_template):
     """
     Create a test FastAPI app with isolated database.
     Uses monkeypatch to override DATABASE_PATH and PUBLIC_DIR.
@@ -48,31 +169,137 @@ def test_app(temp_db_path, tmp_path, monkeypatch):
     monkeypatch.setattr(server, "DATABASE_PATH", temp_db_path)
     monkeypatch.setattr(server, "PUBLIC_DIR", public_dir)
 
-    # Re-initialize database with new path
-    server.init_database()
+    # Start from the initialized schema rather than re-running init_database
+    copy_database(schema_template, temp_db_path)
 
     yield server.app
 
 
+@pytest.fixture(scope="session")
+def session_client(tmp_path_factory):
+    """
+    One TestClient (and event loop portal) shared by the whole test run.
+    Its lifespan initializes a throwaway database; each test still gets
+    its own database through test_app.
+    """
+    import server
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(server, "DATABASE_PATH", tmp_path_factory.mktemp("session") / "journal.db")
+        with ORJSONTestClient(server.app) as c:
+            yield c
+
+
 @pytest.fixture(scope="function")
-def client(test_app):
-    """Create a test client for the FastAPI app."""
-    with TestClient(test_app) as c:
+def client(test_app, session_client):
+    """Test client bound to this test's isolated database."""
+    return session_client
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_client(test_app):
+    """
+    AsyncClient calling the app directly over ASGI, for async tests that
+    issue many requests. Tests that interleave server.get_db() with HTTP
+    calls keep using the sync client.
+    """
+    transport = httpx.ASGITransport(app=test_app)
+    async with ORJSONAsyncClient(transport=transport, base_url="http://testserver") as c:
         yield c
 
 
+@pytest.fixture
+def setup_clients_and_trackers(test_app):
+    """
+    Register clients and seed their trackers without going through HTTP.
+    Takes a list of (client_id, trackers) pairs; reserve HTTP calls for
+    the steps a test actually asserts on.
+    """
+    import server
+
+    def setup(clients):
+        for client_id, trackers in clients:
+            server.register_client(client_id)
+            if trackers:
+                result = server.sync_update(
+                    server.SyncPayload(clientId=client_id, config=trackers)
+                )
+                assert result.success
+    return setup
+
+
+@pytest.fixture
+def mcp_manager(test_app, temp_db_path):
+    """
+    Build journal_mcp DatabaseManagers over this test's database:
+    mcp_manager(max_rows=...) takes MCPConfig overrides. Closed at teardown.
+    """
+    from journal_mcp.config import MCPConfig
+    from journal_mcp.server import DatabaseManager
+
+    managers = []
+
+    def make(**overrides):
+        manager = DatabaseManager(MCPConfig(db_path=temp_db_path, **overrides))
+        managers.append(manager)
+        return manager
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+@pytest.fixture
+def post_sync(client):
+    """
+    POST /api/sync/update for one client: post_sync(client_id, config, days=...).
+    Other keyword arguments (e.g. operations) are added to the payload.
+    """
+    def post(client_id, config=(), days=None, **extra):
+        return client.post("/api/sync/update", json={
+            "clientId": client_id,
+            "config": list(config),
+            "days": days or {},
+            **extra
+        })
+    return post
+
+
+@pytest.fixture
+def client_pool(test_app):
+    """
+    Already-registered client ids. Tests pick slots (client_pool[0],
+    client_pool[1], ...) instead of registering their own names. Registered
+    into this test's database with one bulk insert, so rows other fixtures
+    have already written are kept.
+    """
+    import server
+    server.register_clients(server.BulkRegisterPayload(
+        clients=[{"id": client_id} for client_id in CLIENT_POOL]
+    ))
+    return CLIENT_POOL
+
+
+@pytest.fixture
+def full_sync(test_app):
+    """
+    server.get_full_sync_data, for read-only verification steps that do
+    not need to go through the /api/sync/full HTTP contract.
+    """
+    import server
+    return server.get_full_sync_data
+
+
+@pytest.fixture(scope="session")
+def by_id():
+    """Index a list of synced items (e.g. full["config"]) by their id."""
+    def index(items, key="id"):
+        return {item[key]: item for item in items}
+    return index
+
+
 @pytest.fixture
 def sample_tracker():
     """Sample tracker configuration for tests."""
-    return {
-        "id": "tracker-001",
-        "name": "Water Intake",
-        "category": "health",
-        "type": "quantifiable",
-        "unit": "glasses",
-        "goal": 8,
-        "_baseVersion": 0
-    }
+    return dict(SAMPLE_TRACKER)
 
 
 @pytest.fixture
@@ -87,12 +314,24 @@ def sample_simple_tracker():
     }
 
 
+@pytest.fixture(scope="session")
+def dates():
+    """Date strings for today (0) back to ten days ago (10), formatted once per run."""
+    base = datetime.now()
+    return {i: (base - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(0, 11)}
+
+
+@pytest.fixture
+def past_iso():
+    """UTC timestamp one hour ago, in the server's ISO-8601 "Z" format."""
+    return (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat().replace("+00:00", "Z")
+
+
 @pytest.fixture
-def sample_entry(sample_tracker):
+def sample_entry(sample_tracker, dates):
     """Sample entry data for tests."""
-    today = datetime.now().strftime("%Y-%m-%d")
     return {
-        "date": today,
+        "date": dates[0],
         "tracker_id": sample_tracker["id"],
         "value": 5,
         "completed": False,
@@ -101,49 +340,114 @@ def sample_entry(sample_tracker):
 
 
 @pytest.fixture
-def registered_client(client):
-    """A client that has been registered with the server."""
-    client_id = "test-client-001"
-    response = client.post(f"/api/sync/register?client_id={client_id}&client_name=TestClient")
-    assert response.status_code == 200
-    return client_id
+def registered_client(test_app):
+    """
+    A client that has been registered with the server. Registered by calling
+    the handler directly; test_sync_register covers the HTTP endpoint.
+    """
+    import server
+    server.register_client(REGISTERED_CLIENT_ID, "TestClient")
+    return REGISTERED_CLIENT_ID
+
+
+@pytest.fixture(scope="module")
+def tracker_template(tmp_path_factory, schema_template):
+    """
+    Database file with the registered client and SAMPLE_TRACKER (version 1),
+    built once per test module. created_tracker copies it into each test's
+    isolated database.
+    """
+    import server
+
+    db_path = tmp_path_factory.mktemp("tracker") / "journal.db"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(server, "DATABASE_PATH", db_path)
+        copy_database(schema_template, db_path)
+        server.register_client(REGISTERED_CLIENT_ID, "TestClient")
+
+        # Create a tracker
+        result = server.sync_update(
+            server.SyncPayload(clientId=REGISTERED_CLIENT_ID, config=[SAMPLE_TRACKER])
+        )
+        assert result.success
+    return db_path
 
 
 @pytest.fixture
-def seeded_database(client, registered_client, sample_tracker):
-    """Database seeded with sample data for testing."""
-    # Create a tracker
-    payload = {
-        "clientId": registered_client,
-        "config": [sample_tracker],
-        "days": {}
-    }
-    response = client.post("/api/sync/update", json=payload)
+def created_tracker(test_app, temp_db_path, tracker_template):
+    """SAMPLE_TRACKER, already created on the server by the registered client."""
+    copy_database(tracker_template, temp_db_path)
+    return dict(SAMPLE_TRACKER)
+
+
+@pytest.fixture(scope="class")
+def mixed_update(tmp_path_factory, tracker_template, session_client, dates):
+    """
+    One /api/sync/update response that exercises every outcome at once:
+    an update of SAMPLE_TRACKER (to version 2), a new tracker that a later
+    operation deletes, a new entry, and a stale update of SAMPLE_TRACKER
+    that conflicts. Posted once per test class; tests assert on their slice.
+    """
+    import server
+
+    db_path = tmp_path_factory.mktemp("mixed_update") / "journal.db"
+    copy_database(tracker_template, db_path)
+    new_tracker = {"id": "tracker-new", "name": "New", "category": "test", "type": "simple", "_baseVersion": 0}
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(server, "DATABASE_PATH", db_path)
+        response = session_client.post("/api/sync/update", json={
+            "clientId": REGISTERED_CLIENT_ID,
+            "config": [{**SAMPLE_TRACKER, "name": "Renamed", "_baseVersion": 1}, new_tracker],
+            "days": {dates[0]: {SAMPLE_TRACKER["id"]: {"value": 4, "_baseVersion": 0}}},
+            "operations": [{"config": [
+                {**new_tracker, "_deleted": True, "_baseVersion": 1},
+                {**SAMPLE_TRACKER, "name": "Stale", "_baseVersion": 1}
+            ]}]
+        })
     assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture(scope="module")
+def seeded_database_template(tmp_path_factory, tracker_template, dates):
+    """
+    Database file seeded once per test module.
+    seeded_database copies it into each test's isolated database, so the
+    schema and seed rows are only built once.
+    """
+    import server
+
+    db_path = tmp_path_factory.mktemp("seeded") / "journal.db"
+    copy_database(tracker_template, db_path)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(server, "DATABASE_PATH", db_path)
 
-    # Create entries for the last 3 days
-    today = datetime.now()
-    days = {}
-    for i in range(3):
-        date_str = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-        days[date_str] = {
-            sample_tracker["id"]: {
-                "value": 5 + i,
-                "completed": i == 0,
-                "_baseVersion": 0
+        # Create entries for the last 3 days
+        days = {}
+        for i in range(3):
+            days[dates[i]] = {
+                SAMPLE_TRACKER["id"]: {
+                    "value": 5 + i,
+                    "completed": i == 0,
+                    "_baseVersion": 0
+                }
             }
-        }
+        result = server.sync_update(server.SyncPayload(clientId=REGISTERED_CLIENT_ID, days=days))
+        assert result.success
 
-    payload2 = {
-        "clientId": registered_client,
-        "config": [],
-        "days": days
+    return {
+        "path": db_path,
+        "client_id": REGISTERED_CLIENT_ID,
+        "dates": list(days.keys())
     }
-    response = client.post("/api/sync/update", json=payload2)
-    assert response.status_code == 200
 
+
+@pytest.fixture
+def seeded_database(test_app, temp_db_path, seeded_database_template):
+    """Database seeded with sample data for testing."""
+    copy_database(seeded_database_template["path"], temp_db_path)
     return {
-        "client_id": registered_client,
-        "tracker": sample_tracker,
-        "dates": list(days.keys())
+        "client_id": seeded_database_template["client_id"],
+        "tracker": dict(SAMPLE_TRACKER),
+        "dates": list(seeded_database_template["dates"])
     }
@@ -1,16 +1,12 @@
 """E2E tests for conflict detection and resolution workflows."""
 import pytest
-from datetime import datetime, timedelta
 
 
 @pytest.mark.e2e
 class TestConflictResolutionWorkflow:
-    def test_full_conflict_resolution_flow(self, client):
+    def test_full_conflict_resolution_flow(self, client, setup_clients_and_trackers, by_id,
+                                           full_sync):
         """Test complete conflict detection and resolution workflow."""
-        # Setup
-        client.post("/api/sync/register?client_id=device-1")
-        client.post("/api/sync/register?client_id=device-2")
-
         tracker = {
             "id": "conflict-test",
             "name": "Original Name",
@@ -19,12 +15,8 @@ class TestConflictResolutionWorkflow:
             "_baseVersion": 0
         }
 
-        # Device 1 creates tracker
-        client.post("/api/sync/update", json={
-            "clientId": "device-1",
-            "config": [tracker],
-            "days": {}
-        })
+        # Setup: device 1 creates tracker, device 2 is registered
+        setup_clients_and_trackers([("device-1", [tracker]), ("device-2", [])])
 
         # Device 1 updates (version 2)
         client.post("/api/sync/update", json={
@@ -63,18 +55,13 @@ class TestConflictResolutionWorkflow:
         assert resolve_response.status_code == 200
 
         # Verify resolution
-        full = client.get("/api/sync/full")
-        resolved_tracker = next(
-            t for t in full.json()["config"]
-            if t["id"] == "conflict-test"
-        )
+        full = full_sync()
+        resolved_tracker = by_id(full["config"])["conflict-test"]
         assert resolved_tracker["name"] == "Device 2 Update"
 
-    def test_entry_conflict_resolution_flow(self, client):
+    def test_entry_conflict_resolution_flow(self, client, setup_clients_and_trackers, dates,
+                                            full_sync):
         """Test entry conflict detection and resolution."""
-        client.post("/api/sync/register?client_id=phone")
-        client.post("/api/sync/register?client_id=tablet")
-
         tracker = {
             "id": "water-tracker",
             "name": "Water",
@@ -83,13 +70,9 @@ class TestConflictResolutionWorkflow:
             "_baseVersion": 0
         }
 
-        client.post("/api/sync/update", json={
-            "clientId": "phone",
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([("phone", [tracker]), ("tablet", [])])
 
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = dates[0]
 
         # Phone logs value
         client.post("/api/sync/update", json={
@@ -112,18 +95,19 @@ class TestConflictResolutionWorkflow:
             "days": {today: {"water-tracker": {"value": 8, "_baseVersion": 1}}}
         })
 
-        assert response.json()["success"] is False
-        conflict = response.json()["conflicts"][0]
+        data = response.json()
+        assert data["success"] is False
+        conflict = data["conflicts"][0]
         assert conflict["entityType"] == "entry"
         assert conflict["serverData"]["value"] == 6
 
         # Resolve with tablet's value
-        entity_id = f"{today}|water-tracker"
         client.post(
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "entry",
-                "entity_id": entity_id,
+                "entity_date": today,
+                "entity_tracker_id": "water-tracker",
                 "resolution": "client",
                 "client_id": "tablet"
             },
@@ -131,23 +115,20 @@ class TestConflictResolutionWorkflow:
         )
 
         # Verify
-        full = client.get("/api/sync/full").json()
+        full = full_sync()
         assert full["days"][today]["water-tracker"]["value"] == 8
 
 
 @pytest.mark.e2e
 class TestSevenDayWindow:
-    def test_7_day_window_enforcement_full_sync(self, client, registered_client, sample_tracker):
-        """Entries older than 7 days should not appear in full sync."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+    def test_7_day_window_enforcement(self, client, registered_client, sample_tracker,
+                                      setup_clients_and_trackers, dates, past_iso, full_sync):
+        """Entries older than 7 days should not appear in full or delta sync."""
+        setup_clients_and_trackers([(registered_client, [sample_tracker])])
 
-        old_date = (datetime.now() - timedelta(days=10)).strftime("%Y-%m-%d")
-        recent_date = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
-        today = datetime.now().strftime("%Y-%m-%d")
+        old_date = dates[10]
+        recent_date = dates[3]
+        today = dates[0]
 
         client.post("/api/sync/update", json={
             "clientId": registered_client,
@@ -159,71 +140,46 @@ class TestSevenDayWindow:
             }
         })
 
-        full = client.get("/api/sync/full").json()
+        full = full_sync()
 
         assert today in full["days"]
         assert recent_date in full["days"]
         assert old_date not in full["days"]
 
-    def test_7_day_window_enforcement_delta_sync(self, client, registered_client, sample_tracker):
-        """Entries older than 7 days should not appear in delta sync."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
-        old_date = (datetime.now() - timedelta(days=10)).strftime("%Y-%m-%d")
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {
-                old_date: {sample_tracker["id"]: {"value": 1, "_baseVersion": 0}},
-                today: {sample_tracker["id"]: {"value": 2, "_baseVersion": 0}}
-            }
-        })
-
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
-        delta = client.get(f"/api/sync/delta?since={past}&client_id={registered_client}").json()
+        delta = client.get(f"/api/sync/delta?since={past_iso}&client_id={registered_client}").json()
 
         assert today in delta["days"]
+        assert recent_date in delta["days"]
         assert old_date not in delta["days"]
 
 
 @pytest.mark.e2e
 class TestVersioningIntegrity:
-    def test_version_always_increments(self, client, registered_client, sample_tracker):
+    def test_version_always_increments(self, client, registered_client, sample_tracker,
+                                       setup_clients_and_trackers, by_id, full_sync):
         """Version should always increment on updates."""
-        client.post("/api/sync/update", json={
+        setup_clients_and_trackers([(registered_client, [sample_tracker])])
+
+        # Multiple updates, applied in order within one request
+        updates = [dict(sample_tracker, name=f"Update {i}", _baseVersion=i) for i in range(1, 5)]
+        response = client.post("/api/sync/update", json={
             "clientId": registered_client,
-            "config": [sample_tracker],
+            "config": updates,
             "days": {}
         })
-
-        # Multiple updates
-        for i in range(1, 5):
-            response = client.post("/api/sync/update", json={
-                "clientId": registered_client,
-                "config": [{**sample_tracker, "name": f"Update {i}", "_baseVersion": i}],
-                "days": {}
-            })
-            assert response.json()["success"] is True
-            assert response.json()["appliedConfig"][0]["_version"] == i + 1
+        data = response.json()
+        assert data["success"] is True
+        assert [t["_version"] for t in data["appliedConfig"]] == [2, 3, 4, 5]
 
         # Final version should be 5
-        full = client.get("/api/sync/full").json()
-        tracker = next(t for t in full["config"] if t["id"] == sample_tracker["id"])
+        full = full_sync()
+        tracker = by_id(full["config"])[sample_tracker["id"]]
         assert tracker["_version"] == 5
 
-    def test_conflict_preserves_server_version(self, client, registered_client, sample_tracker):
+    def test_conflict_preserves_server_version(self, client, registered_client, sample_tracker,
+                                               setup_clients_and_trackers, by_id, full_sync):
         """Conflicting update should not change server version."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([(registered_client, [sample_tracker])])
 
         # Update to v2
         client.post("/api/sync/update", json={
@@ -241,15 +197,16 @@ class TestVersioningIntegrity:
         assert response.json()["success"] is False
 
         # Version should still be 2
-        full = client.get("/api/sync/full").json()
-        tracker = next(t for t in full["config"] if t["id"] == sample_tracker["id"])
+        full = full_sync()
+        tracker = by_id(full["config"])[sample_tracker["id"]]
         assert tracker["_version"] == 2
         assert tracker["name"] == "V2"  # Server version preserved
 
 
 @pytest.mark.e2e
 class TestDataIntegrity:
-    def test_metadata_survives_updates(self, client, registered_client):
+    def test_metadata_survives_updates(self, client, registered_client, setup_clients_and_trackers,
+                                       by_id, full_sync):
         """Metadata fields should survive multiple updates."""
         tracker = {
             "id": "metadata-tracker",
@@ -264,23 +221,20 @@ class TestDataIntegrity:
             "_baseVersion": 0
         }
 
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([(registered_client, [tracker])])
 
         # Update name but keep other metadata
-        updated = {**tracker, "name": "Updated Name", "_baseVersion": 1}
+        tracker["name"] = "Updated Name"
+        tracker["_baseVersion"] = 1
         client.post("/api/sync/update", json={
             "clientId": registered_client,
-            "config": [updated],
+            "config": [tracker],
             "days": {}
         })
 
         # Verify all metadata preserved
-        full = client.get("/api/sync/full").json()
-        saved = next(t for t in full["config"] if t["id"] == "metadata-tracker")
+        full = full_sync()
+        saved = by_id(full["config"])["metadata-tracker"]
 
         assert saved["name"] == "Updated Name"
         assert saved["unit"] == "items"
@@ -289,32 +243,19 @@ class TestDataIntegrity:
         assert saved["maxValue"] == 100
         assert saved["customField"] == "custom value"
 
-    def test_boolean_conversion_entries(self, client, registered_client, sample_simple_tracker):
+    @pytest.mark.parametrize("completed", [True, False])
+    def test_boolean_conversion_entries(self, client, registered_client, sample_simple_tracker,
+                                        setup_clients_and_trackers, dates, completed, full_sync):
         """Entry completed field should correctly convert to/from boolean."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_simple_tracker],
-            "days": {}
-        })
-
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        # Test True
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_simple_tracker["id"]: {"completed": True, "_baseVersion": 0}}}
-        })
+        setup_clients_and_trackers([(registered_client, [sample_simple_tracker])])
 
-        full = client.get("/api/sync/full").json()
-        assert full["days"][today][sample_simple_tracker["id"]]["completed"] is True
+        today = dates[0]
 
-        # Test False
         client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [],
-            "days": {today: {sample_simple_tracker["id"]: {"completed": False, "_baseVersion": 1}}}
+            "days": {today: {sample_simple_tracker["id"]: {"completed": completed, "_baseVersion": 0}}}
         })
 
-        full = client.get("/api/sync/full").json()
-        assert full["days"][today][sample_simple_tracker["id"]]["completed"] is False
+        full = full_sync()
+        assert full["days"][today][sample_simple_tracker["id"]]["completed"] is completed
@@ -1,11 +1,10 @@
 """E2E tests for complete sync workflows."""
 import pytest
-from datetime import datetime, timedelta
 
 
 @pytest.mark.e2e
 class TestFreshClientWorkflow:
-    def test_fresh_client_full_sync_workflow(self, client):
+    def test_fresh_client_full_sync_workflow(self, client, dates):
         """Test complete workflow for a new client."""
         # 1. Register client
         client_id = "new-client-e2e"
@@ -31,7 +30,7 @@ class TestFreshClientWorkflow:
             "type": "simple",
             "_baseVersion": 0
         }
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = dates[0]
         payload = {
             "clientId": client_id,
             "config": [tracker],
@@ -58,7 +57,7 @@ class TestFreshClientWorkflow:
 
 @pytest.mark.e2e
 class TestIncrementalSyncWorkflow:
-    def test_incremental_sync_workflow(self, client, seeded_database):
+    def test_incremental_sync_workflow(self, client, seeded_database, by_id):
         """Test delta sync after initial full sync."""
         client_id = seeded_database["client_id"]
 
@@ -85,14 +84,13 @@ class TestIncrementalSyncWorkflow:
         data = response.json()
 
         # Should include new tracker
-        tracker_ids = [t["id"] for t in data["config"]]
-        assert "delta-tracker" in tracker_ids
+        assert "delta-tracker" in by_id(data["config"])
 
         # Should not include original tracker (unchanged since timestamp)
         # Note: Depending on timing, original may or may not appear
         # The key assertion is that delta-tracker IS present
 
-    def test_delta_sync_after_entry_update(self, client, seeded_database):
+    def test_delta_sync_after_entry_update(self, client, seeded_database, dates):
         """Delta sync should show updated entries."""
         client_id = seeded_database["client_id"]
         tracker_id = seeded_database["tracker"]["id"]
@@ -102,7 +100,7 @@ class TestIncrementalSyncWorkflow:
         server_time = response.json()["serverTime"]
 
         # Update an entry
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = dates[0]
         client.post("/api/sync/update", json={
             "clientId": client_id,
             "config": [],
@@ -123,7 +121,8 @@ class TestIncrementalSyncWorkflow:
 
 @pytest.mark.e2e
 class TestTrackerLifecycle:
-    def test_tracker_create_update_delete_lifecycle(self, client, registered_client):
+    def test_tracker_create_update_delete_lifecycle(self, client, registered_client, by_id,
+                                                    past_iso, full_sync):
         """Test complete tracker lifecycle: create, update, delete."""
         tracker = {
             "id": "lifecycle-tracker",
@@ -140,12 +139,13 @@ class TestTrackerLifecycle:
             "config": [tracker],
             "days": {}
         })
-        assert response.json()["success"] is True
-        assert response.json()["appliedConfig"][0]["_version"] == 1
+        data = response.json()
+        assert data["success"] is True
+        assert data["appliedConfig"][0]["_version"] == 1
 
         # Verify exists
-        full = client.get("/api/sync/full").json()
-        assert any(t["id"] == "lifecycle-tracker" for t in full["config"])
+        full = full_sync()
+        assert "lifecycle-tracker" in by_id(full["config"])
 
         # Update
         updated = {**tracker, "name": "Updated Lifecycle", "_baseVersion": 1}
@@ -154,8 +154,9 @@ class TestTrackerLifecycle:
             "config": [updated],
             "days": {}
         })
-        assert response.json()["appliedConfig"][0]["_version"] == 2
-        assert response.json()["appliedConfig"][0]["name"] == "Updated Lifecycle"
+        data = response.json()
+        assert data["appliedConfig"][0]["_version"] == 2
+        assert data["appliedConfig"][0]["name"] == "Updated Lifecycle"
 
         # Delete
         deleted = {**tracker, "_deleted": True, "_baseVersion": 2}
@@ -167,18 +168,18 @@ class TestTrackerLifecycle:
         assert response.json()["success"] is True
 
         # Verify gone from full sync
-        full = client.get("/api/sync/full").json()
-        assert not any(t["id"] == "lifecycle-tracker" for t in full["config"])
+        full = full_sync()
+        assert "lifecycle-tracker" not in by_id(full["config"])
 
         # Verify appears in delta's deletedTrackers
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
-        delta = client.get(f"/api/sync/delta?since={past}&client_id={registered_client}").json()
+        delta = client.get(f"/api/sync/delta?since={past_iso}&client_id={registered_client}").json()
         assert "lifecycle-tracker" in delta["deletedTrackers"]
 
 
 @pytest.mark.e2e
 class TestEntryLifecycle:
-    def test_entry_create_update_workflow(self, client, registered_client, sample_tracker):
+    def test_entry_create_update_workflow(self, client, registered_client, sample_tracker, dates,
+                                          full_sync):
         """Test entry creation and updates over multiple days."""
         # Create tracker
         client.post("/api/sync/update", json={
@@ -187,11 +188,8 @@ class TestEntryLifecycle:
             "days": {}
         })
 
-        today = datetime.now()
-        dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
-
         # Create entries for 3 days
-        days = {d: {sample_tracker["id"]: {"value": i, "_baseVersion": 0}} for i, d in enumerate(dates)}
+        days = {dates[i]: {sample_tracker["id"]: {"value": i, "_baseVersion": 0}} for i in range(3)}
         response = client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [],
@@ -200,8 +198,8 @@ class TestEntryLifecycle:
         assert response.json()["success"] is True
 
         # Verify all entries exist
-        full = client.get("/api/sync/full").json()
-        for d in dates:
+        full = full_sync()
+        for d in days:
             assert d in full["days"]
             assert sample_tracker["id"] in full["days"][d]
 
@@ -211,9 +209,10 @@ class TestEntryLifecycle:
             "config": [],
             "days": {dates[0]: {sample_tracker["id"]: {"value": 100, "_baseVersion": 1}}}
         })
-        assert response.json()["success"] is True
-        assert response.json()["appliedDays"][dates[0]][sample_tracker["id"]]["value"] == 100
+        data = response.json()
+        assert data["success"] is True
+        assert data["appliedDays"][dates[0]][sample_tracker["id"]]["value"] == 100
 
         # Verify update persisted
-        full = client.get("/api/sync/full").json()
+        full = full_sync()
         assert full["days"][dates[0]][sample_tracker["id"]]["value"] == 100
@@ -1,17 +1,14 @@
 """E2E tests for multi-client synchronization scenarios."""
 import pytest
-from datetime import datetime
 
 
 @pytest.mark.e2e
 class TestMultiClientSync:
-    def test_two_clients_create_different_trackers(self, client):
+    async def test_two_clients_create_different_trackers(self, async_client,
+                                                         setup_clients_and_trackers, client_pool, by_id):
         """Two clients should be able to create different trackers."""
-        # Register two clients
-        client.post("/api/sync/register?client_id=client-a")
-        client.post("/api/sync/register?client_id=client-b")
+        client_a, client_b = client_pool[:2]
 
-        # Client A creates tracker
         tracker_a = {
             "id": "tracker-a",
             "name": "Client A Tracker",
@@ -19,13 +16,6 @@ class TestMultiClientSync:
             "type": "simple",
             "_baseVersion": 0
         }
-        client.post("/api/sync/update", json={
-            "clientId": "client-a",
-            "config": [tracker_a],
-            "days": {}
-        })
-
-        # Client B creates different tracker
         tracker_b = {
             "id": "tracker-b",
             "name": "Client B Tracker",
@@ -33,22 +23,21 @@ class TestMultiClientSync:
             "type": "simple",
             "_baseVersion": 0
         }
-        client.post("/api/sync/update", json={
-            "clientId": "client-b",
-            "config": [tracker_b],
-            "days": {}
-        })
 
-        # Both trackers should exist
-        response = client.get("/api/sync/full")
-        tracker_ids = [t["id"] for t in response.json()["config"]]
-        assert "tracker-a" in tracker_ids
-        assert "tracker-b" in tracker_ids
+        # Each client creates its own tracker
+        setup_clients_and_trackers([(client_a, [tracker_a]), (client_b, [tracker_b])])
 
-    def test_concurrent_updates_same_tracker_conflict(self, client):
+        # Both trackers should exist
+        response = await async_client.get("/api/sync/full")
+        assert response.status_code == 200
+        trackers = by_id(response.json()["config"])
+        assert "tracker-a" in trackers
+        assert "tracker-b" in trackers
+
+    async def test_concurrent_updates_same_tracker_conflict(self, async_client,
+                                                            setup_clients_and_trackers, client_pool):
         """Concurrent updates to same tracker should detect conflicts."""
-        client.post("/api/sync/register?client_id=client-x")
-        client.post("/api/sync/register?client_id=client-y")
+        client_x, client_y = client_pool[:2]
 
         # Both clients know tracker at version 0
         tracker = {
@@ -60,24 +49,20 @@ class TestMultiClientSync:
         }
 
         # Client X creates tracker
-        client.post("/api/sync/update", json={
-            "clientId": "client-x",
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([(client_x, [tracker])])
 
         # Client X updates (version 2)
         updated_x = {**tracker, "name": "X Updated", "_baseVersion": 1}
-        client.post("/api/sync/update", json={
-            "clientId": "client-x",
+        await async_client.post("/api/sync/update", json={
+            "clientId": client_x,
             "config": [updated_x],
             "days": {}
         })
 
         # Client Y tries to update from stale base (should conflict)
         updated_y = {**tracker, "name": "Y Updated", "_baseVersion": 1}
-        response = client.post("/api/sync/update", json={
-            "clientId": "client-y",
+        response = await async_client.post("/api/sync/update", json={
+            "clientId": client_y,
             "config": [updated_y],
             "days": {}
         })
@@ -88,10 +73,10 @@ class TestMultiClientSync:
         assert data["conflicts"][0]["serverVersion"] == 2
         assert data["conflicts"][0]["clientBaseVersion"] == 1
 
-    def test_concurrent_entry_updates_conflict(self, client):
+    async def test_concurrent_entry_updates_conflict(self, async_client, setup_clients_and_trackers,
+                                                     dates, client_pool):
         """Concurrent entry updates should detect conflicts."""
-        client.post("/api/sync/register?client_id=phone")
-        client.post("/api/sync/register?client_id=tablet")
+        phone, tablet = client_pool[:2]
 
         # Create shared tracker
         tracker = {
@@ -101,24 +86,20 @@ class TestMultiClientSync:
             "type": "quantifiable",
             "_baseVersion": 0
         }
-        client.post("/api/sync/update", json={
-            "clientId": "phone",
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([(phone, [tracker])])
 
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = dates[0]
 
         # Phone logs 3 glasses
-        client.post("/api/sync/update", json={
-            "clientId": "phone",
+        await async_client.post("/api/sync/update", json={
+            "clientId": phone,
             "config": [],
             "days": {today: {"water": {"value": 3, "_baseVersion": 0}}}
         })
 
         # Tablet logs 5 glasses (with old base version - conflict!)
-        response = client.post("/api/sync/update", json={
-            "clientId": "tablet",
+        response = await async_client.post("/api/sync/update", json={
+            "clientId": tablet,
             "config": [],
             "days": {today: {"water": {"value": 5, "_baseVersion": 0}}}
         })
@@ -127,10 +108,11 @@ class TestMultiClientSync:
         assert data["success"] is False
         assert data["conflicts"][0]["entityType"] == "entry"
 
-    def test_sequential_updates_no_conflict(self, client):
+    async def test_sequential_updates_no_conflict(self, async_client,
+                                                  setup_clients_and_trackers, client_pool, by_id,
+                                                  full_sync):
         """Sequential updates with correct versions should not conflict."""
-        client.post("/api/sync/register?client_id=device-1")
-        client.post("/api/sync/register?client_id=device-2")
+        device_1, device_2 = client_pool[:2]
 
         tracker = {
             "id": "sequential-tracker",
@@ -141,20 +123,16 @@ class TestMultiClientSync:
         }
 
         # Device 1 creates tracker
-        client.post("/api/sync/update", json={
-            "clientId": "device-1",
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([(device_1, [tracker])])
 
         # Device 2 syncs and gets version 1
-        full = client.get("/api/sync/full").json()
-        tracker_v1 = next(t for t in full["config"] if t["id"] == "sequential-tracker")
+        full = full_sync()
+        tracker_v1 = by_id(full["config"])["sequential-tracker"]
         assert tracker_v1["_version"] == 1
 
         # Device 2 updates with correct base version
-        response = client.post("/api/sync/update", json={
-            "clientId": "device-2",
+        response = await async_client.post("/api/sync/update", json={
+            "clientId": device_2,
             "config": [{
                 **tracker,
                 "name": "Device 2 Update",
@@ -163,14 +141,14 @@ class TestMultiClientSync:
             "days": {}
         })
 
-        assert response.json()["success"] is True
-        assert response.json()["appliedConfig"][0]["_version"] == 2
+        data = response.json()
+        assert data["success"] is True
+        assert data["appliedConfig"][0]["_version"] == 2
 
-    def test_three_clients_sync_scenario(self, client):
+    async def test_three_clients_sync_scenario(self, async_client, setup_clients_and_trackers,
+                                               dates, client_pool, full_sync):
         """Complex scenario with three clients syncing."""
-        # Register three clients
-        for name in ["laptop", "phone", "tablet"]:
-            client.post(f"/api/sync/register?client_id={name}")
+        laptop, phone, tablet = client_pool[:3]
 
         # Laptop creates tracker
         tracker = {
@@ -180,48 +158,41 @@ class TestMultiClientSync:
             "type": "simple",
             "_baseVersion": 0
         }
-        client.post("/api/sync/update", json={
-            "clientId": "laptop",
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([(laptop, [tracker])])
 
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = dates[0]
 
         # Phone marks exercise as done
-        client.post("/api/sync/update", json={
-            "clientId": "phone",
+        await async_client.post("/api/sync/update", json={
+            "clientId": phone,
             "config": [],
             "days": {today: {"exercise": {"completed": True, "_baseVersion": 0}}}
         })
 
         # Tablet syncs and sees the entry
-        full = client.get("/api/sync/full").json()
+        full = full_sync()
         assert today in full["days"]
         assert full["days"][today]["exercise"]["completed"] is True
 
         # Tablet updates entry with correct version
-        response = client.post("/api/sync/update", json={
-            "clientId": "tablet",
+        response = await async_client.post("/api/sync/update", json={
+            "clientId": tablet,
             "config": [],
             "days": {today: {"exercise": {"completed": False, "_baseVersion": 1}}}
         })
         assert response.json()["success"] is True
 
         # All clients see updated value
-        full = client.get("/api/sync/full").json()
+        full = full_sync()
         assert full["days"][today]["exercise"]["completed"] is False
 
 
 @pytest.mark.e2e
 class TestClientTracking:
-    def test_last_modified_by_tracked(self, client, test_app):
+    def test_last_modified_by_tracked(self, client, test_app, setup_clients_and_trackers):
         """Last modified by should track which client made changes."""
         import server
 
-        client.post("/api/sync/register?client_id=client-alpha")
-        client.post("/api/sync/register?client_id=client-beta")
-
         tracker = {
             "id": "tracked-tracker",
             "name": "Tracked",
@@ -231,29 +202,21 @@ class TestClientTracking:
         }
 
         # Alpha creates tracker
-        client.post("/api/sync/update", json={
-            "clientId": "client-alpha",
-            "config": [tracker],
-            "days": {}
-        })
+        setup_clients_and_trackers([("client-alpha", [tracker]), ("client-beta", [])])
 
-        # Check last_modified_by
+        query = "SELECT last_modified_by FROM trackers WHERE id = ?"
         with server.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT last_modified_by FROM trackers WHERE id = ?", ("tracked-tracker",))
-            row = cursor.fetchone()
+            # Check last_modified_by
+            row = conn.execute(query, ("tracked-tracker",)).fetchone()
             assert row["last_modified_by"] == "client-alpha"
 
-        # Beta updates tracker
-        client.post("/api/sync/update", json={
-            "clientId": "client-beta",
-            "config": [{**tracker, "name": "Updated by Beta", "_baseVersion": 1}],
-            "days": {}
-        })
+            # Beta updates tracker
+            client.post("/api/sync/update", json={
+                "clientId": "client-beta",
+                "config": [{**tracker, "name": "Updated by Beta", "_baseVersion": 1}],
+                "days": {}
+            })
 
-        # Check last_modified_by changed
-        with server.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT last_modified_by FROM trackers WHERE id = ?", ("tracked-tracker",))
-            row = cursor.fetchone()
+            # Check last_modified_by changed
+            row = conn.execute(query, ("tracked-tracker",)).fetchone()
             assert row["last_modified_by"] == "client-beta"
@@ -1,6 +1,10 @@
 """Integration tests for static file serving."""
+import re
+
 import pytest
 
+VERSION_PARAM = re.compile(r'\?v=([a-f0-9]{8})')
+
 
 @pytest.mark.integration
 class TestStaticFiles:
@@ -47,11 +51,33 @@ class TestStaticFiles:
         cache_control = response.headers.get("cache-control", "")
         assert "no-cache" in cache_control
 
+    def test_matching_etag_returns_304(self, client):
+        """Revalidating with the current ETag should return an empty 304."""
+        etag = client.get("/js/app.js").headers["etag"]
+        response = client.get("/js/app.js", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert "no-cache" in response.headers["cache-control"]
+
+    def test_stale_etag_returns_file(self, client):
+        """A non-matching ETag should get the full file."""
+        response = client.get("/styles.css", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.text == "body { margin: 0; }"
+
     def test_missing_js_file_returns_404(self, client):
         """Missing JS files should return 404."""
         response = client.get("/js/nonexistent.js")
         assert response.status_code == 404
 
+    def test_js_directory_returns_404(self, client, test_app):
+        """Paths that exist but are not regular files should return 404."""
+        import server
+        (server.PUBLIC_DIR / "js" / "lib").mkdir()
+        response = client.get("/js/lib")
+        assert response.status_code == 404
+
     def test_missing_css_file_returns_404(self, client, test_app, tmp_path, monkeypatch):
         """Missing CSS file should return 404."""
         import server
@@ -73,10 +99,24 @@ class TestStaticFiles:
         assert "?v=" in content
 
         # Version should be 8 hex characters
-        import re
-        match = re.search(r'\?v=([a-f0-9]{8})', content)
+        match = VERSION_PARAM.search(content)
         assert match is not None
 
+    def test_index_edits_are_picked_up(self, client, test_app):
+        """Rewritten index.html should be refreshed when the file changes."""
+        import os
+        import server
+        index_path = server.PUBLIC_DIR / "index.html"
+        assert "Test" in client.get("/").text
+
+        index_path.write_text('<html><link rel="stylesheet" href="/styles.css">Edited</html>')
+        stat = index_path.stat()
+        os.utime(index_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        content = client.get("/").text
+        assert "Edited" in content
+        assert f"styles.css?v={server.SERVER_VERSION}" in content
+
     def test_html_has_no_cache_header(self, client):
         """HTML page should have no-cache header."""
         response = client.get("/")
@@ -106,3 +146,4 @@ class TestCORS:
         assert response.status_code == 200
         assert "access-control-allow-origin" in response.headers
         assert "access-control-allow-methods" in response.headers
+        assert response.headers["access-control-max-age"] == "86400"
@@ -1,38 +1,31 @@
 """Integration tests for conflict resolution endpoints."""
 import pytest
-from datetime import datetime
 
 
 @pytest.mark.integration
 class TestResolveConflict:
-    def test_resolve_tracker_conflict_with_client(self, client, registered_client, sample_tracker):
+    def test_resolve_tracker_conflict_with_client(self, client, registered_client, created_tracker,
+                                                  by_id, full_sync):
         """Should apply client data when resolving with 'client' resolution."""
-        # Create tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
         # Update to version 2
         client.post("/api/sync/update", json={
             "clientId": registered_client,
-            "config": [{**sample_tracker, "name": "Server Version", "_baseVersion": 1}],
+            "config": [{**created_tracker, "name": "Server Version", "_baseVersion": 1}],
             "days": {}
         })
 
         # Resolve with client data
         client_data = {
-            "id": sample_tracker["id"],
+            "id": created_tracker["id"],
             "name": "Client Wins",
-            "category": sample_tracker["category"],
-            "type": sample_tracker["type"]
+            "category": created_tracker["category"],
+            "type": created_tracker["type"]
         }
         response = client.post(
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "tracker",
-                "entity_id": sample_tracker["id"],
+                "entity_id": created_tracker["id"],
                 "resolution": "client",
                 "client_id": registered_client
             },
@@ -42,27 +35,20 @@ class TestResolveConflict:
         data = response.json()
         assert data["status"] == "ok"
         assert data["resolution"] == "client"
-        assert data["entityId"] == sample_tracker["id"]
+        assert data["entityId"] == created_tracker["id"]
 
         # Verify client data was applied
-        full_response = client.get("/api/sync/full")
-        tracker = next(
-            t for t in full_response.json()["config"]
-            if t["id"] == sample_tracker["id"]
-        )
+        full = full_sync()
+        tracker = by_id(full["config"])[created_tracker["id"]]
         assert tracker["name"] == "Client Wins"
 
-    def test_resolve_tracker_conflict_with_server(self, client, registered_client, sample_tracker):
+    def test_resolve_tracker_conflict_with_server(self, client, registered_client, created_tracker,
+                                                  by_id, full_sync):
         """Should keep server data when resolving with 'server' resolution."""
-        # Create and update tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        # Update to version 2
         client.post("/api/sync/update", json={
             "clientId": registered_client,
-            "config": [{**sample_tracker, "name": "Server Version", "_baseVersion": 1}],
+            "config": [{**created_tracker, "name": "Server Version", "_baseVersion": 1}],
             "days": {}
         })
 
@@ -71,7 +57,7 @@ class TestResolveConflict:
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "tracker",
-                "entity_id": sample_tracker["id"],
+                "entity_id": created_tracker["id"],
                 "resolution": "server",
                 "client_id": registered_client
             }
@@ -80,38 +66,30 @@ class TestResolveConflict:
         assert response.json()["resolution"] == "server"
 
         # Server data should remain
-        full_response = client.get("/api/sync/full")
-        tracker = next(
-            t for t in full_response.json()["config"]
-            if t["id"] == sample_tracker["id"]
-        )
+        full = full_sync()
+        tracker = by_id(full["config"])[created_tracker["id"]]
         assert tracker["name"] == "Server Version"
 
-    def test_resolve_entry_conflict_with_client(self, client, registered_client, sample_tracker):
+    def test_resolve_entry_conflict_with_client(self, client, registered_client, created_tracker, dates,
+                                                full_sync):
         """Should resolve entry conflicts with client data."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = dates[0]
 
         # Create and update entry
         client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [],
-            "days": {today: {sample_tracker["id"]: {"value": 5, "_baseVersion": 0}}}
+            "days": {today: {created_tracker["id"]: {"value": 5, "_baseVersion": 0}}}
         })
 
         # Resolve with client data
-        entity_id = f"{today}|{sample_tracker['id']}"
         client_data = {"value": 10, "completed": True}
         response = client.post(
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "entry",
-                "entity_id": entity_id,
+                "entity_date": today,
+                "entity_tracker_id": created_tracker["id"],
                 "resolution": "client",
                 "client_id": registered_client
             },
@@ -121,25 +99,52 @@ class TestResolveConflict:
         assert response.json()["status"] == "ok"
 
         # Verify entry was updated
-        full_response = client.get("/api/sync/full")
-        entry = full_response.json()["days"][today][sample_tracker["id"]]
+        full = full_sync()
+        entry = full["days"][today][created_tracker["id"]]
         assert entry["value"] == 10
         assert entry["completed"] is True
 
-    def test_resolution_increments_version(self, client, registered_client, sample_tracker, test_app):
+    def test_resolve_entry_conflict_with_combined_id(self, client, registered_client, created_tracker,
+                                                     dates, full_sync):
+        """The older "date|tracker_id" entity_id should still resolve entries."""
+        today = dates[0]
+        response = client.post(
+            "/api/sync/resolve-conflict",
+            params={
+                "entity_type": "entry",
+                "entity_id": f"{today}|{created_tracker['id']}",
+                "resolution": "client",
+                "client_id": registered_client
+            },
+            json={"value": 7, "completed": False}
+        )
+        assert response.status_code == 200
+        assert response.json()["entityId"] == f"{today}|{created_tracker['id']}"
+        assert full_sync()["days"][today][created_tracker["id"]]["value"] == 7
+
+    @pytest.mark.parametrize("entity_id", ["tracker-001", "2024-01-15|tracker-001|extra"])
+    def test_resolve_entry_conflict_with_malformed_id(self, client, registered_client, entity_id):
+        """An entry entity_id that is not exactly "date|tracker_id" should be rejected."""
+        response = client.post(
+            "/api/sync/resolve-conflict",
+            params={
+                "entity_type": "entry",
+                "entity_id": entity_id,
+                "resolution": "client",
+                "client_id": registered_client
+            },
+            json={"value": 7}
+        )
+        assert response.status_code == 422
+
+    def test_resolution_increments_version(self, client, registered_client, created_tracker, test_app):
         """Client resolution should increment version."""
         import server
 
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
         # Get initial version
         with server.get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT version FROM trackers WHERE id = ?", (sample_tracker["id"],))
+            cursor.execute("SELECT version FROM trackers WHERE id = ?", (created_tracker["id"],))
             initial_version = cursor.fetchone()["version"]
 
         # Resolve conflict
@@ -147,7 +152,7 @@ class TestResolveConflict:
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "tracker",
-                "entity_id": sample_tracker["id"],
+                "entity_id": created_tracker["id"],
                 "resolution": "client",
                 "client_id": registered_client
             },
@@ -157,26 +162,20 @@ class TestResolveConflict:
         # Check version incremented
         with server.get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT version FROM trackers WHERE id = ?", (sample_tracker["id"],))
+            cursor.execute("SELECT version FROM trackers WHERE id = ?", (created_tracker["id"],))
             new_version = cursor.fetchone()["version"]
 
         assert new_version == initial_version + 1
 
-    def test_resolution_logged_in_sync_conflicts(self, client, registered_client, sample_tracker, test_app):
+    def test_resolution_logged_in_sync_conflicts(self, client, registered_client, created_tracker, test_app):
         """Resolution should be logged in sync_conflicts table."""
         import server
 
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
         client.post(
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "tracker",
-                "entity_id": sample_tracker["id"],
+                "entity_id": created_tracker["id"],
                 "resolution": "client",
                 "client_id": registered_client
             },
@@ -188,7 +187,7 @@ class TestResolveConflict:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM sync_conflicts WHERE entity_id = ?",
-                (sample_tracker["id"],)
+                (created_tracker["id"],)
             )
             row = cursor.fetchone()
 
@@ -212,20 +211,14 @@ class TestGetUnresolvedConflicts:
         response = client.get("/api/sync/conflicts")
         assert response.status_code == 422
 
-    def test_excludes_resolved_conflicts(self, client, registered_client, sample_tracker):
+    def test_excludes_resolved_conflicts(self, client, registered_client, created_tracker, by_id):
         """Should not include conflicts that have been resolved."""
-        # Create tracker and resolve a "conflict"
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
+        # Resolve a "conflict"
         client.post(
             "/api/sync/resolve-conflict",
             params={
                 "entity_type": "tracker",
-                "entity_id": sample_tracker["id"],
+                "entity_id": created_tracker["id"],
                 "resolution": "client",
                 "client_id": registered_client
             },
@@ -236,5 +229,4 @@ class TestGetUnresolvedConflicts:
         response = client.get(f"/api/sync/conflicts?client_id={registered_client}")
         # Note: The resolved conflict has resolved_at set, so it won't appear
         data = response.json()
-        unresolved = [c for c in data["conflicts"] if c.get("entityId") == sample_tracker["id"]]
-        assert len(unresolved) == 0
+        assert created_tracker["id"] not in by_id(data["conflicts"], key="entityId")
@@ -1,17 +1,14 @@
 """Integration tests for GET /api/sync/delta endpoint."""
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 
 @pytest.mark.integration
 class TestSyncDelta:
-    def test_returns_changes_since_timestamp(self, client, seeded_database):
+    def test_returns_changes_since_timestamp(self, client, seeded_database, past_iso):
         """Should return only changes since the given timestamp."""
-        # Get a timestamp from the past
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
-
         response = client.get(
-            f"/api/sync/delta?since={past}&client_id={seeded_database['client_id']}"
+            f"/api/sync/delta?since={past_iso}&client_id={seeded_database['client_id']}"
         )
         assert response.status_code == 200
         data = response.json()
@@ -20,11 +17,10 @@ class TestSyncDelta:
         assert "deletedTrackers" in data
         assert "serverTime" in data
 
-    def test_response_structure(self, client, seeded_database):
+    def test_response_structure(self, client, seeded_database, past_iso):
         """Response should have correct structure."""
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
         response = client.get(
-            f"/api/sync/delta?since={past}&client_id={seeded_database['client_id']}"
+            f"/api/sync/delta?since={past_iso}&client_id={seeded_database['client_id']}"
         )
         data = response.json()
 
@@ -63,15 +59,14 @@ class TestSyncDelta:
         response = client.get(f"/api/sync/delta?client_id={registered_client}")
         assert response.status_code == 422  # Validation error
 
-    def test_requires_client_id_parameter(self, client):
+    def test_requires_client_id_parameter(self, client, past_iso):
         """Should require client_id parameter."""
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
-        response = client.get(f"/api/sync/delta?since={past}")
+        response = client.get(f"/api/sync/delta?since={past_iso}")
         assert response.status_code == 422  # Validation error
 
     def test_empty_response_for_future_timestamp(self, client, seeded_database):
         """Future timestamp should return empty changes."""
-        future = (datetime.utcnow() + timedelta(hours=1)).isoformat() + "Z"
+        future = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat().replace("+00:00", "Z")
         response = client.get(
             f"/api/sync/delta?since={future}&client_id={seeded_database['client_id']}"
         )
@@ -82,12 +77,12 @@ class TestSyncDelta:
         assert data["days"] == {}
         assert data["deletedTrackers"] == []
 
-    def test_only_returns_recent_entries(self, client, registered_client, sample_tracker):
+    def test_only_returns_recent_entries(self, client, registered_client, sample_tracker, dates,
+                                         past_iso):
         """Should only return entries from last 7 days."""
         # Create tracker and entries
-        old_date = (datetime.now() - timedelta(days=10)).strftime("%Y-%m-%d")
-        today = datetime.now().strftime("%Y-%m-%d")
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
+        old_date = dates[10]
+        today = dates[0]
 
         client.post("/api/sync/update", json={
             "clientId": registered_client,
@@ -99,18 +94,17 @@ class TestSyncDelta:
         })
 
         response = client.get(
-            f"/api/sync/delta?since={past}&client_id={registered_client}"
+            f"/api/sync/delta?since={past_iso}&client_id={registered_client}"
         )
         days = response.json()["days"]
 
         assert today in days
         assert old_date not in days
 
-    def test_includes_version_metadata(self, client, seeded_database):
+    def test_includes_version_metadata(self, client, seeded_database, past_iso):
         """Returned items should include version metadata."""
-        past = (datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z"
         response = client.get(
-            f"/api/sync/delta?since={past}&client_id={seeded_database['client_id']}"
+            f"/api/sync/delta?since={past_iso}&client_id={seeded_database['client_id']}"
         )
         data = response.json()
 
@@ -1,6 +1,5 @@
 """Integration tests for GET /api/sync/full endpoint."""
 import pytest
-from datetime import datetime, timedelta
 
 
 @pytest.mark.integration
@@ -22,14 +21,13 @@ class TestSyncFull:
         assert data["serverTime"].endswith("Z")
         assert "T" in data["serverTime"]
 
-    def test_returns_all_trackers(self, client, seeded_database):
+    def test_returns_all_trackers(self, client, seeded_database, by_id):
         """Should return all non-deleted trackers."""
         response = client.get("/api/sync/full")
         assert response.status_code == 200
         data = response.json()
         assert len(data["config"]) >= 1
-        tracker_ids = [t["id"] for t in data["config"]]
-        assert seeded_database["tracker"]["id"] in tracker_ids
+        assert seeded_database["tracker"]["id"] in by_id(data["config"])
 
     def test_tracker_includes_all_fields(self, client, seeded_database):
         """Returned trackers should include all expected fields."""
@@ -44,35 +42,28 @@ class TestSyncFull:
         assert "_lastModifiedBy" in tracker
         assert "_lastModifiedAt" in tracker
 
-    def test_returns_entries_within_7_days(self, client, seeded_database):
+    def test_returns_entries_within_7_days(self, client, seeded_database, dates):
         """Should return entries from the last 7 days."""
         response = client.get("/api/sync/full")
         data = response.json()
 
         # Check that returned dates are within 7 days
-        seven_days_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        seven_days_ago = dates[7]
         for date_str in data["days"].keys():
             assert date_str >= seven_days_ago
 
-    def test_excludes_entries_older_than_7_days(self, client, registered_client, sample_tracker):
+    def test_excludes_entries_older_than_7_days(self, client, registered_client, created_tracker, dates):
         """Entries older than 7 days should not appear."""
-        # Create tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
         # Create entry for 10 days ago
-        old_date = (datetime.now() - timedelta(days=10)).strftime("%Y-%m-%d")
-        today = datetime.now().strftime("%Y-%m-%d")
+        old_date = dates[10]
+        today = dates[0]
 
         client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [],
             "days": {
-                old_date: {sample_tracker["id"]: {"value": 1, "_baseVersion": 0}},
-                today: {sample_tracker["id"]: {"value": 2, "_baseVersion": 0}}
+                old_date: {created_tracker["id"]: {"value": 1, "_baseVersion": 0}},
+                today: {created_tracker["id"]: {"value": 2, "_baseVersion": 0}}
             }
         })
 
@@ -83,17 +74,10 @@ class TestSyncFull:
         assert today in days
         assert old_date not in days
 
-    def test_excludes_deleted_trackers(self, client, registered_client, sample_tracker):
+    def test_excludes_deleted_trackers(self, client, registered_client, created_tracker, by_id):
         """Deleted trackers should not appear in full sync."""
-        # Create tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
         # Delete tracker
-        deleted_tracker = {**sample_tracker, "_deleted": True, "_baseVersion": 1}
+        deleted_tracker = {**created_tracker, "_deleted": True, "_baseVersion": 1}
         client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [deleted_tracker],
@@ -103,8 +87,7 @@ class TestSyncFull:
         # Full sync should not include deleted tracker
         response = client.get("/api/sync/full")
         data = response.json()
-        tracker_ids = [t["id"] for t in data["config"]]
-        assert sample_tracker["id"] not in tracker_ids
+        assert created_tracker["id"] not in by_id(data["config"])
 
     def test_includes_version_metadata(self, client, seeded_database):
         """Response should include version metadata for conflict tracking."""
@@ -128,7 +111,24 @@ class TestSyncFull:
                 assert isinstance(entry, dict)
                 assert "_version" in entry
 
-    def test_metadata_fields_merged(self, client, registered_client):
+    def test_not_blocked_by_open_write(self, client, created_tracker, temp_db_path, by_id):
+        """Reads should proceed while another connection holds a write transaction."""
+        import sqlite3
+        writer = sqlite3.connect(temp_db_path, isolation_level=None)
+        try:
+            writer.execute("BEGIN EXCLUSIVE")
+            writer.execute("UPDATE trackers SET name = 'Uncommitted' WHERE id = ?",
+                           (created_tracker["id"],))
+
+            response = client.get("/api/sync/full")
+            assert response.status_code == 200
+            tracker = by_id(response.json()["config"])[created_tracker["id"]]
+            assert tracker["name"] == created_tracker["name"]
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+    def test_metadata_fields_merged(self, client, registered_client, by_id):
         """Extra metadata fields should be merged into tracker."""
         tracker = {
             "id": "quantifiable-tracker",
@@ -148,10 +148,7 @@ class TestSyncFull:
         })
 
         response = client.get("/api/sync/full")
-        saved_tracker = next(
-            t for t in response.json()["config"]
-            if t["id"] == "quantifiable-tracker"
-        )
+        saved_tracker = by_id(response.json()["config"])["quantifiable-tracker"]
 
         assert saved_tracker["unit"] == "glasses"
         assert saved_tracker["goal"] == 8
@@ -33,12 +33,24 @@ class TestSyncRegister:
         assert response2.status_code == 200
         assert response2.json()["status"] == "ok"
 
-    def test_multiple_clients_can_register(self, client):
-        """Multiple different clients should be able to register."""
-        for i in range(5):
-            response = client.post(f"/api/sync/register?client_id=client-{i}")
-            assert response.status_code == 200
-            assert response.json()["clientId"] == f"client-{i}"
+    def test_multiple_clients_can_register(self, client, test_app):
+        """Multiple different clients should be able to register, one by one or in bulk."""
+        import server
+        response = client.post("/api/sync/register?client_id=client-0")
+        assert response.status_code == 200
+        assert response.json()["clientId"] == "client-0"
+
+        bulk = [{"id": f"client-{i}"} for i in range(1, 5)]
+        bulk[0]["name"] = "MyTablet"
+        response = client.post("/api/sync/register/bulk", json={"clients": bulk})
+        assert response.status_code == 200
+        assert response.json()["clientIds"] == [f"client-{i}" for i in range(1, 5)]
+
+        with server.get_db() as conn:
+            names = dict(conn.execute("SELECT id, name FROM clients WHERE id LIKE 'client-%'"))
+        assert set(names) == {f"client-{i}" for i in range(5)}
+        assert names["client-1"] == "MyTablet"
+        assert names["client-2"] == "Client-client-2"
 
     def test_client_id_required(self, client):
         """Should fail without client_id parameter."""
@@ -58,3 +70,9 @@ class TestSyncRegister:
             row = cursor.fetchone()
             assert row is not None
             assert "abcd1234" in row["name"]
+
+    def test_client_pool_keeps_existing_clients(self, registered_client, client_pool, srv):
+        """Seeding the client pool should not drop clients registered before it."""
+        with srv.get_db() as conn:
+            ids = {client_id for (client_id,) in conn.execute("SELECT id FROM clients")}
+        assert ids == {registered_client, *client_pool}
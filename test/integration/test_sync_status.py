@@ -11,32 +11,17 @@ class TestSyncStatus:
         data = response.json()
         assert data["lastModified"] is None
 
-    def test_returns_timestamp_after_sync(self, client, registered_client, sample_tracker):
+    def test_returns_timestamp_after_sync(self, client, created_tracker):
         """Should return lastModified timestamp after successful sync."""
-        # Perform a sync
-        payload = {
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        }
-        client.post("/api/sync/update", json=payload)
-
-        # Check status
+        # created_tracker comes from a sync by the registered client
         response = client.get("/api/sync/status")
         assert response.status_code == 200
         data = response.json()
         assert data["lastModified"] is not None
         assert data["lastModified"].endswith("Z")
 
-    def test_timestamp_format_is_iso8601(self, client, registered_client, sample_tracker):
+    def test_timestamp_format_is_iso8601(self, client, created_tracker):
         """lastModified should be ISO-8601 format with Z suffix."""
-        payload = {
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        }
-        client.post("/api/sync/update", json=payload)
-
         response = client.get("/api/sync/status")
         timestamp = response.json()["lastModified"]
 
@@ -44,21 +29,13 @@ class TestSyncStatus:
         assert "T" in timestamp
         assert timestamp.endswith("Z")
 
-    def test_timestamp_not_updated_on_conflict(self, client, registered_client, sample_tracker):
+    def test_timestamp_not_updated_on_conflict(self, client, registered_client, created_tracker):
         """lastModified should not update when sync has conflicts."""
-        # Create tracker
-        payload = {
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        }
-        client.post("/api/sync/update", json=payload)
-
         # Get initial timestamp
         initial_timestamp = client.get("/api/sync/status").json()["lastModified"]
 
         # Update tracker to version 2
-        updated = {**sample_tracker, "name": "Updated", "_baseVersion": 1}
+        updated = {**created_tracker, "name": "Updated", "_baseVersion": 1}
         client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [updated],
@@ -66,7 +43,7 @@ class TestSyncStatus:
         })
 
         # Try stale update (will conflict)
-        stale = {**sample_tracker, "name": "Stale", "_baseVersion": 1}
+        stale = {**created_tracker, "name": "Stale", "_baseVersion": 1}
         response = client.post("/api/sync/update", json={
             "clientId": registered_client,
             "config": [stale],
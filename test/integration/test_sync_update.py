@@ -1,6 +1,5 @@
 """Integration tests for POST /api/sync/update endpoint."""
 import pytest
-from datetime import datetime
 
 
 @pytest.mark.integration
@@ -19,74 +18,47 @@ class TestSyncUpdateTrackers:
         assert len(data["appliedConfig"]) == 1
         assert data["appliedConfig"][0]["_version"] == 1
 
-    def test_update_existing_tracker(self, client, registered_client, sample_tracker):
+    def test_update_existing_tracker(self, post_sync, registered_client, created_tracker):
         """Should update tracker with incremented version."""
-        # Create tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
-        # Update tracker
-        updated = {**sample_tracker, "name": "Updated Name", "_baseVersion": 1}
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [updated],
-            "days": {}
-        })
+        updated = {**created_tracker, "name": "Updated Name", "_baseVersion": 1}
+        response = post_sync(registered_client, [updated])
         data = response.json()
         assert data["success"] is True
         assert data["appliedConfig"][0]["_version"] == 2
         assert data["appliedConfig"][0]["name"] == "Updated Name"
 
-    def test_soft_delete_tracker(self, client, registered_client, sample_tracker):
+    def test_soft_delete_tracker(self, post_sync, registered_client, created_tracker, by_id, full_sync):
         """Should soft-delete tracker when _deleted flag is set."""
-        # Create tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
-        # Delete tracker
-        deleted = {**sample_tracker, "_deleted": True, "_baseVersion": 1}
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [deleted],
-            "days": {}
-        })
+        deleted = {**created_tracker, "_deleted": True, "_baseVersion": 1}
+        response = post_sync(registered_client, [deleted])
         assert response.status_code == 200
 
         # Verify tracker is excluded from full sync
-        full_response = client.get("/api/sync/full")
-        trackers = full_response.json()["config"]
-        assert not any(t["id"] == sample_tracker["id"] for t in trackers)
+        assert created_tracker["id"] not in by_id(full_sync()["config"])
 
-    def test_conflict_detection_tracker(self, client, registered_client, sample_tracker):
+    def test_conflict_detection_tracker(self, post_sync, registered_client, created_tracker):
         """Should detect conflict when server version > client base version."""
-        # Create tracker (version 1)
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        # Update tracker to version 2
+        updated = {**created_tracker, "name": "Updated", "_baseVersion": 1}
+        assert post_sync(registered_client, [updated]).json()["success"] is True
 
-        # Update tracker (version 2)
-        updated = {**sample_tracker, "name": "Updated", "_baseVersion": 1}
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [updated],
-            "days": {}
-        })
+        # A later request from the stale base conflicts with the committed row
+        stale = {**created_tracker, "name": "Stale Update", "_baseVersion": 1}
+        response = post_sync(registered_client, [stale])
+        data = response.json()
 
-        # Try to update with stale base version (should conflict)
-        stale = {**sample_tracker, "name": "Stale Update", "_baseVersion": 1}
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [stale],
-            "days": {}
-        })
+        assert data["success"] is False
+        assert len(data["conflicts"]) == 1
+        assert data["conflicts"][0]["entityType"] == "tracker"
+        assert data["conflicts"][0]["serverVersion"] == 2
+        assert data["conflicts"][0]["clientBaseVersion"] == 1
+        assert data["conflicts"][0]["serverData"]["name"] == "Updated"
+
+    def test_conflict_detection_tracker_within_request(self, post_sync, registered_client, created_tracker):
+        """A stale update in a later operation should conflict with an earlier one's write."""
+        updated = {**created_tracker, "name": "Updated", "_baseVersion": 1}
+        stale = {**created_tracker, "name": "Stale Update", "_baseVersion": 1}
+        response = post_sync(registered_client, [updated], operations=[{"config": [stale]}])
         data = response.json()
 
         assert data["success"] is False
@@ -95,7 +67,7 @@ class TestSyncUpdateTrackers:
         assert data["conflicts"][0]["serverVersion"] == 2
         assert data["conflicts"][0]["clientBaseVersion"] == 1
 
-    def test_metadata_json_preserved(self, client, registered_client):
+    def test_metadata_json_preserved(self, post_sync, registered_client, by_id, full_sync):
         """Extra tracker fields should be preserved in meta_json."""
         tracker = {
             "id": "tracker-meta",
@@ -108,62 +80,68 @@ class TestSyncUpdateTrackers:
             "maxValue": 20,
             "_baseVersion": 0
         }
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [tracker],
-            "days": {}
-        })
+        post_sync(registered_client, [tracker])
 
         # Retrieve and verify
-        response = client.get("/api/sync/full")
-        config = response.json()["config"]
-        saved_tracker = next(t for t in config if t["id"] == "tracker-meta")
+        config = full_sync()["config"]
+        saved_tracker = by_id(config)["tracker-meta"]
 
         assert saved_tracker["unit"] == "glasses"
         assert saved_tracker["goal"] == 8
         assert saved_tracker["minValue"] == 0
         assert saved_tracker["maxValue"] == 20
 
-    def test_multiple_trackers_in_single_update(self, client, registered_client):
+    def test_metadata_with_large_integer(self, srv, registered_client, by_id, full_sync):
+        """Metadata integers beyond 64 bits should round-trip, not fail the sync."""
+        # Called directly: the orjson-encoding test client cannot send 2 ** 70
+        tracker = {"id": "tracker-big", "name": "Big", "goal": 2 ** 70, "_baseVersion": 0}
+        result = srv.sync_update(srv.SyncPayload(clientId=registered_client, config=[tracker]))
+        assert result.success
+        assert by_id(full_sync()["config"])["tracker-big"]["goal"] == 2 ** 70
+
+    def test_multiple_trackers_in_single_update(self, post_sync, registered_client):
         """Should handle multiple trackers in single update."""
         trackers = [
             {"id": f"tracker-{i}", "name": f"Tracker {i}", "category": "test", "type": "simple", "_baseVersion": 0}
             for i in range(3)
         ]
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": trackers,
-            "days": {}
-        })
+        response = post_sync(registered_client, trackers)
         data = response.json()
 
         assert data["success"] is True
         assert len(data["appliedConfig"]) == 3
 
+    def test_bulk_100_trackers(self, post_sync, registered_client, by_id, full_sync):
+        """A large batch of new trackers should all be written in one update."""
+        trackers = [
+            {"id": f"bulk-{i:03}", "name": f"Bulk {i}", "category": "test", "type": "simple",
+             "goal": i, "_baseVersion": 0}
+            for i in range(100)
+        ]
+        data = post_sync(registered_client, trackers).json()
+
+        assert data["success"] is True
+        assert {item["_version"] for item in data["appliedConfig"]} == {1}
+        config = by_id(full_sync()["config"])
+        assert len(config) == 100
+        assert config["bulk-099"]["goal"] == 99
+
 
 @pytest.mark.integration
 class TestSyncUpdateEntries:
-    def test_create_entry(self, client, registered_client, sample_tracker):
+    def test_create_entry(self, post_sync, registered_client, sample_tracker, dates):
         """Should successfully create entry for a tracker."""
         # First create tracker
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        post_sync(registered_client, [sample_tracker])
 
         # Create entry
-        today = datetime.now().strftime("%Y-%m-%d")
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {
-                today: {
-                    sample_tracker["id"]: {
-                        "value": 5,
-                        "completed": False,
-                        "_baseVersion": 0
-                    }
+        today = dates[0]
+        response = post_sync(registered_client, days={
+            today: {
+                sample_tracker["id"]: {
+                    "value": 5,
+                    "completed": False,
+                    "_baseVersion": 0
                 }
             }
         })
@@ -172,85 +150,89 @@ class TestSyncUpdateEntries:
         assert today in data["appliedDays"]
         assert data["appliedDays"][today][sample_tracker["id"]]["value"] == 5
 
-    def test_update_entry(self, client, registered_client, sample_tracker):
+    def test_update_entry(self, post_sync, registered_client, sample_tracker, dates):
         """Should update entry with incremented version."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        # Create entry
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_tracker["id"]: {"value": 3, "_baseVersion": 0}}}
-        })
-
-        # Update entry
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_tracker["id"]: {"value": 5, "_baseVersion": 1}}}
-        })
+        today = dates[0]
+
+        # Create tracker and entry, then update the entry, as sequential operations
+        response = post_sync(
+            registered_client, [sample_tracker],
+            days={today: {sample_tracker["id"]: {"value": 3, "_baseVersion": 0}}},
+            operations=[
+                {"days": {today: {sample_tracker["id"]: {"value": 5, "_baseVersion": 1}}}}
+            ]
+        )
         data = response.json()
 
         assert data["success"] is True
         assert data["appliedDays"][today][sample_tracker["id"]]["_version"] == 2
         assert data["appliedDays"][today][sample_tracker["id"]]["value"] == 5
 
-    def test_conflict_detection_entry(self, client, registered_client, sample_tracker):
-        """Should detect conflict for entry updates."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-
-        today = datetime.now().strftime("%Y-%m-%d")
+    def test_conflict_in_later_operation(self, post_sync, registered_client, sample_tracker, dates):
+        """Later operations see earlier ones' writes, and their conflicts are reported."""
+        today = dates[0]
+        response = post_sync(registered_client, [sample_tracker], operations=[
+            {"days": {today: {sample_tracker["id"]: {"value": 1, "_baseVersion": 0}}}},
+            {"days": {today: {sample_tracker["id"]: {"value": 2, "_baseVersion": 0}}}}
+        ])
+        data = response.json()
 
-        # Create entry (version 1)
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_tracker["id"]: {"value": 5, "_baseVersion": 0}}}
-        })
+        assert data["success"] is False
+        assert data["lastModified"] is None
+        assert data["conflicts"][0]["entityId"] == f"{today}|{sample_tracker['id']}"
+        assert data["conflicts"][0]["serverData"]["value"] == 1
 
-        # Update entry (version 2)
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_tracker["id"]: {"value": 6, "_baseVersion": 1}}}
-        })
+    def test_conflict_detection_entry(self, post_sync, registered_client, created_tracker, dates):
+        """Should detect conflict for entry updates."""
+        today = dates[0]
+        tracker_id = created_tracker["id"]
+
+        # Create entry (version 1) and update it (version 2)
+        response = post_sync(
+            registered_client,
+            days={today: {tracker_id: {"value": 5, "_baseVersion": 0}}},
+            operations=[{"days": {today: {tracker_id: {"value": 6, "_baseVersion": 1}}}}]
+        )
+        assert response.json()["success"] is True
+
+        # A later request from the stale base conflicts with the committed row
+        response = post_sync(registered_client, days={today: {tracker_id: {"value": 7, "_baseVersion": 1}}})
+        data = response.json()
 
-        # Try stale update (should conflict)
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_tracker["id"]: {"value": 7, "_baseVersion": 1}}}
-        })
+        assert data["success"] is False
+        assert len(data["conflicts"]) == 1
+        assert data["conflicts"][0]["entityType"] == "entry"
+        assert f"{today}|{tracker_id}" == data["conflicts"][0]["entityId"]
+        assert data["conflicts"][0]["serverData"]["value"] == 6
+
+    def test_conflict_detection_entry_within_request(self, post_sync, registered_client, created_tracker, dates):
+        """Entry conflicts should also be detected between operations of one request."""
+        today = dates[0]
+        tracker_id = created_tracker["id"]
+
+        # Create entry (version 1), update it (version 2), then try a stale update
+        response = post_sync(
+            registered_client,
+            days={today: {tracker_id: {"value": 5, "_baseVersion": 0}}},
+            operations=[
+                {"days": {today: {tracker_id: {"value": 6, "_baseVersion": 1}}}},
+                {"days": {today: {tracker_id: {"value": 7, "_baseVersion": 1}}}}
+            ]
+        )
         data = response.json()
 
         assert data["success"] is False
         assert len(data["conflicts"]) == 1
         assert data["conflicts"][0]["entityType"] == "entry"
-        assert f"{today}|{sample_tracker['id']}" == data["conflicts"][0]["entityId"]
+        assert f"{today}|{tracker_id}" == data["conflicts"][0]["entityId"]
 
-    def test_entry_with_null_value(self, client, registered_client, sample_simple_tracker):
+    def test_entry_with_null_value(self, post_sync, registered_client, sample_simple_tracker, dates):
         """Should handle entry with null value (simple tracker)."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_simple_tracker],
-            "days": {}
-        })
+        post_sync(registered_client, [sample_simple_tracker])
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": {today: {sample_simple_tracker["id"]: {"value": None, "completed": True, "_baseVersion": 0}}}
+        today = dates[0]
+        response = post_sync(registered_client, days={
+            today: {sample_simple_tracker["id"]: {"value": None, "completed": True, "_baseVersion": 0}}
         })
         data = response.json()
 
@@ -258,28 +240,13 @@ class TestSyncUpdateEntries:
         entry = data["appliedDays"][today][sample_simple_tracker["id"]]
         assert entry["completed"] is True
 
-    def test_multiple_entries_multiple_dates(self, client, registered_client, sample_tracker):
+    def test_multiple_entries_multiple_dates(self, post_sync, registered_client, sample_tracker, dates):
         """Should handle multiple entries across multiple dates."""
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        post_sync(registered_client, [sample_tracker])
 
-        from datetime import timedelta
-        today = datetime.now()
-        days = {}
-        for i in range(3):
-            date_str = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            days[date_str] = {
-                sample_tracker["id"]: {"value": 5 + i, "_baseVersion": 0}
-            }
+        days = {dates[i]: {sample_tracker["id"]: {"value": 5 + i, "_baseVersion": 0}} for i in range(3)}
 
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [],
-            "days": days
-        })
+        response = post_sync(registered_client, days=days)
         data = response.json()
 
         assert data["success"] is True
@@ -288,98 +255,58 @@ class TestSyncUpdateEntries:
 
 @pytest.mark.integration
 class TestSyncUpdateResponse:
-    def test_success_true_when_no_conflicts(self, client, registered_client, sample_tracker):
+    def test_success_true_when_no_conflicts(self, post_sync, registered_client, sample_tracker):
         """success should be True when there are no conflicts."""
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        response = post_sync(registered_client, [sample_tracker])
         data = response.json()
 
         assert data["success"] is True
         assert data["conflicts"] == []
 
-    def test_success_false_with_conflicts(self, client, registered_client, sample_tracker):
-        """success should be False when there are conflicts."""
-        # Create and update tracker to force conflict
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [{**sample_tracker, "name": "V2", "_baseVersion": 1}],
-            "days": {}
-        })
-
-        # Stale update
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [{**sample_tracker, "name": "Stale", "_baseVersion": 1}],
-            "days": {}
-        })
-        data = response.json()
-
-        assert data["success"] is False
-        assert len(data["conflicts"]) > 0
-
-    def test_last_modified_only_on_success(self, client, registered_client, sample_tracker):
+    def test_last_modified_only_on_success(self, post_sync, registered_client, sample_tracker):
         """lastModified should only be set on successful sync."""
         # Successful sync
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [sample_tracker],
-            "days": {}
-        })
+        response = post_sync(registered_client, [sample_tracker])
         assert response.json()["lastModified"] is not None
 
-        # Force conflict
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [{**sample_tracker, "name": "V2", "_baseVersion": 1}],
-            "days": {}
-        })
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [{**sample_tracker, "name": "Stale", "_baseVersion": 1}],
-            "days": {}
-        })
+        # Force conflict: update to V2, then a stale update in a later request
+        post_sync(registered_client, [{**sample_tracker, "name": "V2", "_baseVersion": 1}])
+        response = post_sync(registered_client, [{**sample_tracker, "name": "Stale", "_baseVersion": 1}])
         assert response.json()["lastModified"] is None
 
-    def test_partial_success(self, client, registered_client):
-        """Should handle mixed success/conflict scenarios."""
-        # Create two trackers
-        tracker1 = {"id": "t1", "name": "Tracker 1", "category": "test", "type": "simple", "_baseVersion": 0}
-        tracker2 = {"id": "t2", "name": "Tracker 2", "category": "test", "type": "simple", "_baseVersion": 0}
-
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [tracker1, tracker2],
-            "days": {}
-        })
-
-        # Update only tracker1 to version 2
-        client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [{**tracker1, "name": "T1 V2", "_baseVersion": 1}],
-            "days": {}
-        })
 
-        # Try to update both: tracker1 with stale version, tracker2 with correct version
-        response = client.post("/api/sync/update", json={
-            "clientId": registered_client,
-            "config": [
-                {**tracker1, "name": "T1 Stale", "_baseVersion": 1},  # Conflict
-                {**tracker2, "name": "T2 Updated", "_baseVersion": 1}  # Success
-            ],
-            "days": {}
-        })
-        data = response.json()
-
-        assert data["success"] is False
-        assert len(data["conflicts"]) == 1
-        assert data["conflicts"][0]["entityId"] == "t1"
-        # tracker2 should still be applied
-        assert any(t["id"] == "t2" for t in data["appliedConfig"])
+@pytest.mark.integration
+class TestSyncUpdateMixedOutcomes:
+    """Slices of the single mixed_update response; see its fixture for the payload."""
+
+    def test_reports_failure_for_conflict(self, mixed_update):
+        """A conflict anywhere in the request should make it unsuccessful."""
+        assert mixed_update["success"] is False
+        assert mixed_update["lastModified"] is None
+
+    def test_stale_update_conflicts(self, mixed_update):
+        """Only the stale tracker update should conflict, against the version written earlier."""
+        assert len(mixed_update["conflicts"]) == 1
+        conflict = mixed_update["conflicts"][0]
+        assert conflict["entityId"] == "tracker-001"
+        assert conflict["serverVersion"] == 2
+        assert conflict["clientBaseVersion"] == 1
+        assert conflict["serverData"]["name"] == "Renamed"
+
+    def test_updates_applied_alongside_conflict(self, mixed_update):
+        """Non-conflicting tracker writes should still be applied."""
+        applied = [(item["id"], item["_version"]) for item in mixed_update["appliedConfig"][:2]]
+        assert applied == [("tracker-001", 2), ("tracker-new", 1)]
+
+    def test_delete_in_later_operation(self, mixed_update):
+        """A tracker created in one operation can be deleted by the next."""
+        deleted = mixed_update["appliedConfig"][-1]
+        assert deleted["id"] == "tracker-new"
+        assert deleted["_deleted"] is True
+        assert deleted["_version"] == 2
+
+    def test_entry_applied_alongside_conflict(self, mixed_update, dates):
+        """Entries should be applied even when a tracker in the request conflicts."""
+        entry = mixed_update["appliedDays"][dates[0]]["tracker-001"]
+        assert entry["value"] == 4
+        assert entry["_version"] == 1
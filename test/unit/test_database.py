@@ -5,45 +5,78 @@ import sqlite3
 
 @pytest.mark.unit
 class TestGetDb:
-    def test_returns_connection_with_row_factory(self, test_app, temp_db_path):
+    def test_returns_connection_with_row_factory(self, srv, test_app, temp_db_path):
         """get_db should return connection with sqlite3.Row factory."""
-        import server
-        with server.get_db() as conn:
+        with srv.get_db() as conn:
             assert conn.row_factory == sqlite3.Row
 
-    def test_connection_closes_after_context(self, test_app, temp_db_path):
-        """Connection should be closed after context manager exits."""
-        import server
-        conn_ref = None
-        with server.get_db() as conn:
-            conn_ref = conn
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-        # After context, connection should be closed
+    def test_reuses_connection_per_thread(self, srv, test_app, temp_db_path):
+        """get_db should hand the same thread its cached connection."""
+        with srv.get_db() as first:
+            pass
+        with srv.get_db() as second:
+            second.execute("SELECT 1")
+        assert second is first
+
+    def test_connection_uses_wal(self, srv, test_app, temp_db_path):
+        """Connections should be opened in WAL mode."""
+        with srv.get_db() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_uncommitted_work_rolled_back(self, srv, test_app, temp_db_path):
+        """Work left uncommitted should not leak into the next use."""
+        with srv.get_db() as conn:
+            conn.execute("INSERT INTO clients (id, name) VALUES ('dangling', 'x')")
+        with srv.get_db() as conn:
+            assert conn.execute("SELECT 1 FROM clients WHERE id = 'dangling'").fetchone() is None
+
+
+    def test_path_change_closes_old_connection(self, srv, test_app, temp_db_path, tmp_path, monkeypatch):
+        """Switching DATABASE_PATH should close the connection to the old file."""
+        with srv.get_db() as old:
+            pass
+        monkeypatch.setattr(srv, "DATABASE_PATH", str(tmp_path / "other.db"))
+        with srv.get_db() as new:
+            assert new is not old
         with pytest.raises(sqlite3.ProgrammingError):
-            conn_ref.execute("SELECT 1")
+            old.execute("SELECT 1")
+
+    def test_close_db(self, srv, test_app, temp_db_path):
+        """close_db should close the cached connection; the next get_db opens a fresh one."""
+        with srv.get_db() as old:
+            pass
+        srv.close_db()
+        with pytest.raises(sqlite3.ProgrammingError):
+            old.execute("SELECT 1")
+        srv.close_db()  # nothing cached: no-op
+        with srv.get_db() as new:
+            assert new is not old
+            new.execute("SELECT 1")
 
 
 @pytest.mark.unit
 class TestInitDatabase:
-    def test_creates_all_required_tables(self, test_app, temp_db_path):
+    def test_creates_all_required_tables(self, schema_conn):
         """init_database should create all required tables."""
-        import server
-        with server.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = {row[0] for row in cursor.fetchall()}
+        cursor = schema_conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {name for (name,) in cursor}
 
         expected_tables = {'clients', 'meta_sync', 'trackers', 'entries', 'sync_conflicts'}
         assert expected_tables.issubset(tables)
 
-    def test_creates_required_indexes(self, test_app, temp_db_path):
+    def test_enables_wal_journal(self, srv, test_app, temp_db_path):
+        """init_database should leave the database file in WAL mode."""
+        srv.init_database()
+        conn = sqlite3.connect(temp_db_path)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+
+    def test_creates_required_indexes(self, schema_conn):
         """init_database should create performance indexes."""
-        import server
-        with server.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
-            indexes = {row[0] for row in cursor.fetchall()}
+        cursor = schema_conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        indexes = {name for (name,) in cursor}
 
         expected_indexes = {
             'idx_trackers_name',
@@ -54,26 +87,20 @@ class TestInitDatabase:
         }
         assert expected_indexes.issubset(indexes)
 
-    def test_trackers_table_has_versioning_columns(self, test_app, temp_db_path):
+    def test_trackers_table_has_versioning_columns(self, schema_conn):
         """trackers table should have versioning columns."""
-        import server
-        with server.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(trackers)")
-            columns = {row[1] for row in cursor.fetchall()}
+        cursor = schema_conn.execute("PRAGMA table_info(trackers)")
+        columns = {row[1] for row in cursor}
 
         assert 'version' in columns
         assert 'last_modified_by' in columns
         assert 'last_modified_at' in columns
         assert 'deleted' in columns
 
-    def test_entries_table_has_versioning_columns(self, test_app, temp_db_path):
+    def test_entries_table_has_versioning_columns(self, schema_conn):
         """entries table should have versioning columns."""
-        import server
-        with server.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(entries)")
-            columns = {row[1] for row in cursor.fetchall()}
+        cursor = schema_conn.execute("PRAGMA table_info(entries)")
+        columns = {row[1] for row in cursor}
 
         assert 'version' in columns
         assert 'last_modified_by' in columns
@@ -82,29 +109,31 @@ class TestInitDatabase:
 
 @pytest.mark.unit
 class TestGetUtcNow:
-    def test_returns_iso_format_with_z_suffix(self, test_app):
+    def test_returns_iso_format_with_z_suffix(self, srv, test_app):
         """get_utc_now should return ISO-8601 format with Z suffix."""
-        import server
-        result = server.get_utc_now()
+        result = srv.get_utc_now()
         assert result.endswith("Z")
         assert "T" in result
 
-    def test_returns_parseable_datetime(self, test_app):
+    def test_returns_parseable_datetime(self, srv, test_app):
         """get_utc_now should return parseable datetime string."""
-        import server
         from datetime import datetime
-        result = server.get_utc_now()
+        result = srv.get_utc_now()
         # Should be parseable (remove Z and parse)
         parsed = datetime.fromisoformat(result.replace("Z", "+00:00"))
         assert parsed is not None
 
-    def test_returns_current_time(self, test_app):
+    def test_returns_current_time(self, srv, test_app):
         """get_utc_now should return approximately current time."""
-        import server
-        from datetime import datetime, timezone
-        result = server.get_utc_now()
+        import time
+        from datetime import datetime
+        result = srv.get_utc_now()
         parsed = datetime.fromisoformat(result.replace("Z", "+00:00"))
-        now = datetime.now(timezone.utc)
         # Should be within 1 second
-        diff = abs((now - parsed).total_seconds())
-        assert diff < 1
+        assert abs(time.time() - parsed.timestamp()) < 1
+
+    def test_always_includes_microseconds(self, srv, test_app):
+        """Timestamps should keep a fixed width so they compare as strings."""
+        result = srv.get_utc_now()
+        assert len(result) == len("2024-01-01T00:00:00.000000Z")
+        assert result[19] == "."
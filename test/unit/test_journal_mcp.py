@@ -0,0 +1,376 @@
+"""Unit tests for the journal MCP server's database access and tools."""
+import pytest
+
+
+@pytest.fixture
+def entries_for(srv, setup_clients_and_trackers, dates):
+    """Register a client with the given trackers and log one entry per tracker today."""
+    def seed(trackers):
+        setup_clients_and_trackers([("mcp-client", trackers)])
+        result = srv.sync_update(srv.SyncPayload(clientId="mcp-client", days={
+            dates[0]: {tracker["id"]: {"value": 1, "_baseVersion": 0} for tracker in trackers}
+        }))
+        assert result.success
+    return seed
+
+
+def make_trackers(count, category="health"):
+    return [
+        {"id": f"mcp-{i}", "name": f"Tracker {i}", "category": category, "_baseVersion": 0}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestGetJournalSummary:
+    def test_category_totals_not_truncated_by_row_limit(self, mcp_manager, entries_for):
+        """Category totals should count every tracker, even past max_rows."""
+        from journal_mcp.server import get_journal_summary
+        entries_for(make_trackers(5))
+
+        summary = get_journal_summary(mcp_manager(max_rows=2), days=7)
+        assert summary["total_entries"] == 5
+        assert summary["entries_by_category"] == [{"category": "health", "entry_count": 5}]
+        assert len(summary["top_trackers"]) == 5
+
+
+@pytest.mark.unit
+class TestGetRowCounts:
+    def test_estimate_includes_soft_deleted_trackers(self, srv, mcp_manager, setup_clients_and_trackers):
+        """After ANALYZE, the estimate should not come from the partial deleted = 0 index."""
+        trackers = make_trackers(6)
+        setup_clients_and_trackers([("mcp-client", trackers)])
+        manager = mcp_manager()  # creates the partial idx_trackers_category index
+        result = srv.sync_update(srv.SyncPayload(clientId="mcp-client", config=[
+            {**tracker, "_deleted": True, "_baseVersion": 1} for tracker in trackers[:4]
+        ]))
+        assert result.success
+        with srv.get_db() as conn:
+            conn.execute("ANALYZE")
+            partial = conn.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE idx = 'idx_trackers_category'"
+            ).fetchone()
+        assert partial["stat"].split()[0] == "2"
+
+        assert manager.get_row_counts(["trackers"]) == {"trackers": 6}
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    @pytest.fixture
+    def opened(self, monkeypatch):
+        """Connections opened by journal_mcp, in order."""
+        import journal_mcp.server as mcp_server
+        opened = []
+        open_connection = mcp_server.open_readonly_connection
+
+        def tracking_open(db_path):
+            opened.append(open_connection(db_path))
+            return opened[-1]
+        monkeypatch.setattr(mcp_server, "open_readonly_connection", tracking_open)
+        return opened
+
+    def test_opens_connections_on_demand(self, mcp_manager, opened):
+        """No connections should be opened until a query needs one, and idle ones are reused."""
+        manager = mcp_manager()
+        assert opened == []
+        with manager.get_connection() as first:
+            pass
+        with manager.get_connection() as second:
+            pass
+        assert second is first
+        assert len(opened) == 1
+
+    def test_waits_once_pool_size_is_reached(self, mcp_manager, opened):
+        """Borrowers beyond pool_size should wait for a connection to be returned."""
+        import threading
+        manager = mcp_manager(pool_size=2)
+        borrowed = []
+
+        def borrow():
+            with manager.get_connection() as conn:
+                borrowed.append(conn)
+        waiter = threading.Thread(target=borrow)
+        with manager.get_connection(), manager.get_connection():
+            waiter.start()
+            waiter.join(0.05)
+            assert waiter.is_alive()
+        waiter.join(1)
+        assert borrowed and borrowed[0] in opened
+        assert len(opened) == 2
+
+    def test_close_closes_idle_connections(self, mcp_manager, opened):
+        """close() should close pooled connections; later calls open fresh ones."""
+        import sqlite3
+        manager = mcp_manager()
+        with manager.get_connection():
+            pass
+        manager.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+        with manager.get_connection() as conn:
+            assert conn.execute("SELECT 1").fetchone()[0] == 1
+        assert len(opened) == 2
+
+
+@pytest.mark.unit
+class TestQueryValidator:
+    @pytest.mark.parametrize("query", [
+        "SELECT 'a;b'",
+        'SELECT "x;" FROM trackers',
+        "SELECT 'it''s; fine'",
+        'SELECT "a""b;c"',
+        "SELECT 'unterminated; ",
+    ])
+    def test_semicolons_inside_quotes_allowed(self, query):
+        """Semicolons inside quoted strings (doubled or unterminated) are not separators."""
+        from journal_mcp.server import QueryValidator
+        QueryValidator.validate_query(query)
+
+    @pytest.mark.parametrize("query", [
+        "SELECT 1;",
+        "SELECT 1; SELECT 2",
+        "SELECT 'a'; SELECT 'b'",
+        "SELECT 'it''s'; SELECT 1",
+    ])
+    def test_statement_separators_rejected(self, query):
+        """A semicolon outside quotes should be rejected, even a trailing one."""
+        from journal_mcp.server import QueryValidator
+        with pytest.raises(ValueError, match="Multiple statements"):
+            QueryValidator.validate_query(query)
+
+    @pytest.mark.parametrize("query", [
+        "SELECT * FROM trackers WHERE delete = 1",
+        "select * from trackers where DELETE = 1",
+        "WITH x AS (SELECT 1) SELECT * FROM x WHERE 1 = 0 OR Update = 1",
+        "SELECT 'drop'",
+    ])
+    def test_forbidden_keywords_rejected_in_any_case(self, query):
+        """Forbidden keywords should be caught as whole words regardless of case, even in strings."""
+        from journal_mcp.server import QueryValidator
+        with pytest.raises(ValueError, match="Forbidden keyword"):
+            QueryValidator.validate_query(query)
+
+    @pytest.mark.parametrize("query", [
+        "SELECT updated_at FROM trackers",
+        "SELECT * FROM trackers WHERE deleted = 0",
+        "SELECT created, dropped, analyzed_at FROM x",
+    ])
+    def test_keywords_inside_identifiers_allowed(self, query):
+        """Identifiers that merely contain a keyword should not be rejected."""
+        from journal_mcp.server import QueryValidator
+        QueryValidator.validate_query(query)
+
+    @pytest.mark.parametrize("query", [
+        "SELECT 1",
+        "  \n\tselect 1",
+        "WITH x AS (SELECT 1) SELECT * FROM x",
+        "\n  with x as (select 1) select * from x",
+    ])
+    def test_allowed_prefix_after_whitespace(self, query):
+        """SELECT and WITH should be accepted in any case after leading whitespace."""
+        from journal_mcp.server import QueryValidator
+        QueryValidator.validate_query(query)
+
+    @pytest.mark.parametrize("query", [
+        "",
+        "   ",
+        "-- read\nSELECT 1",
+        "/* read */ SELECT 1",
+        "EXPLAIN SELECT 1",
+        "VALUES (1)",
+    ])
+    def test_other_prefixes_rejected(self, query):
+        """Anything not starting with SELECT or WITH, including a leading comment, is rejected."""
+        from journal_mcp.server import QueryValidator
+        with pytest.raises(ValueError, match="empty|Only SELECT, WITH"):
+            QueryValidator.validate_query(query)
+
+    def test_limit_in_tail_kept(self):
+        """A LIMIT near the end of the query should be left alone."""
+        from journal_mcp.server import QueryValidator
+        query = "SELECT * FROM entries ORDER BY date DESC limit 5"
+        assert QueryValidator.add_row_limit(query, 10) == query
+
+    def test_limit_only_mid_query_kept(self):
+        """A LIMIT further back than the searched tail should still be found."""
+        from journal_mcp.server import QueryValidator
+        query = (
+            "SELECT * FROM (SELECT * FROM entries LIMIT 5) AS recent "
+            "JOIN trackers ON recent.tracker_id = trackers.id ORDER BY trackers.category, trackers.name"
+        )
+        assert len(query) - query.index("LIMIT") > 64
+        assert QueryValidator.add_row_limit(query, 10) == query
+
+    def test_limit_added_when_missing(self):
+        """Queries without LIMIT get one, replacing a trailing semicolon."""
+        from journal_mcp.server import QueryValidator
+        assert QueryValidator.add_row_limit("SELECT * FROM entries;", 10) == "SELECT * FROM entries LIMIT 10"
+
+    def test_limit_inside_identifier_ignored(self):
+        """A word merely containing "limit" (e.g. an "unlimited" column) does not count as a LIMIT."""
+        from journal_mcp.server import QueryValidator
+        assert QueryValidator.add_row_limit("SELECT unlimited FROM t", 10) == "SELECT unlimited FROM t LIMIT 10"
+
+
+@pytest.mark.unit
+class TestSchemaCache:
+    @pytest.fixture
+    def computed(self):
+        """compute callable for DatabaseManager.cached that counts its calls."""
+        calls = []
+
+        def compute():
+            calls.append(len(calls))
+            return len(calls)
+        compute.calls = calls
+        return compute
+
+    def test_hit_while_nothing_changes(self, mcp_manager, computed):
+        """Repeated lookups should reuse the cached value."""
+        manager = mcp_manager()
+        assert manager.cached("key", computed) == 1
+        assert manager.cached("key", computed) == 1
+        assert len(computed.calls) == 1
+
+    def test_miss_after_ddl(self, srv, mcp_manager, computed):
+        """Creating a table should invalidate cached schema results."""
+        from journal_mcp.server import explore_database_structure
+        manager = mcp_manager()
+        assert "notes" not in explore_database_structure(manager)["available_tables"]
+        manager.cached("key", computed)
+
+        with srv.get_db() as conn:
+            conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY)")
+            conn.commit()
+
+        assert "notes" in explore_database_structure(manager)["available_tables"]
+        assert manager.cached("key", computed) == 2
+
+    def test_miss_after_wal_write(self, srv, mcp_manager, computed, registered_client):
+        """A write that only reaches the WAL file should also invalidate the cache."""
+        manager = mcp_manager()
+        manager.cached("key", computed)
+        wal_path = manager.config.db_path.with_name(manager.config.db_path.name + "-wal")
+        wal_before = wal_path.stat().st_mtime_ns
+
+        with srv.get_db() as conn:
+            conn.execute("INSERT INTO clients (id, name) VALUES ('wal-writer', 'x')")
+            conn.commit()
+
+        assert wal_path.stat().st_mtime_ns != wal_before
+        assert manager.cached("key", computed) == 2
+
+    def test_miss_after_ttl(self, mcp_manager, computed, monkeypatch):
+        """Entries older than schema_cache_ttl should be recomputed."""
+        import time
+        import journal_mcp.server as mcp_server
+        manager = mcp_manager(schema_cache_ttl=60)
+        now = time.monotonic()
+        monkeypatch.setattr(mcp_server.time, "monotonic", lambda: now)
+        manager.cached("key", computed)
+
+        monkeypatch.setattr(mcp_server.time, "monotonic", lambda: now + 59)
+        assert manager.cached("key", computed) == 1
+        monkeypatch.setattr(mcp_server.time, "monotonic", lambda: now + 61)
+        assert manager.cached("key", computed) == 2
+
+
+@pytest.mark.unit
+class TestGetEntries:
+    @pytest.mark.parametrize("kwargs,message", [
+        ({"start_date": "2024/01/01"}, "start_date must be in YYYY-MM-DD format"),
+        ({"end_date": "01-01-2024"}, "end_date must be in YYYY-MM-DD format"),
+        ({"start_date": "2024-02-30"}, "start_date is not a valid date"),
+        ({"start_date": "2024-01-02", "end_date": "2024-01-01"}, "start_date .* is after end_date"),
+    ])
+    def test_rejects_bad_dates(self, mcp_manager, kwargs, message):
+        """Malformed, impossible or inverted dates should be rejected before querying."""
+        from journal_mcp.server import get_entries
+        with pytest.raises(ValueError, match=message):
+            get_entries(mcp_manager(), **kwargs)
+
+    def test_valid_range_returns_entries(self, mcp_manager, entries_for, dates):
+        """A valid range should return the entries inside it."""
+        from journal_mcp.server import get_entries
+        entries_for(make_trackers(2))
+        manager = mcp_manager()
+
+        entries = get_entries(manager, start_date=dates[1], end_date=dates[0])
+        assert [(entry["date"], entry["tracker_name"]) for entry in entries] == [
+            (dates[0], "Tracker 0"), (dates[0], "Tracker 1")
+        ]
+        assert get_entries(manager, start_date=dates[3], end_date=dates[1]) == []
+
+
+@pytest.mark.unit
+class TestListTrackers:
+    @pytest.fixture
+    def manager(self, srv, mcp_manager, setup_clients_and_trackers):
+        """Trackers in two categories, one of them soft-deleted."""
+        trackers = [
+            {"id": "run", "name": "Run", "category": "Habits", "_baseVersion": 0},
+            {"id": "water", "name": "Water", "category": "Health", "unit": "cups", "_baseVersion": 0},
+            {"id": "apple", "name": "Apple", "category": "Health", "_baseVersion": 0},
+            {"id": "zinc", "name": "Zinc", "category": "Health", "_baseVersion": 0},
+        ]
+        setup_clients_and_trackers([("mcp-client", trackers)])
+        result = srv.sync_update(srv.SyncPayload(clientId="mcp-client", config=[
+            {**trackers[3], "_deleted": True, "_baseVersion": 1}
+        ]))
+        assert result.success
+        return mcp_manager()
+
+    @pytest.mark.parametrize("category,include_deleted,expected", [
+        (None, False, ["Run", "Apple", "Water"]),
+        ("", False, ["Run", "Apple", "Water"]),
+        ("Health", False, ["Apple", "Water"]),
+        (None, True, ["Run", "Apple", "Water", "Zinc"]),
+        ("Health", True, ["Apple", "Water", "Zinc"]),
+    ])
+    def test_filter_combinations(self, manager, category, include_deleted, expected):
+        """Each filter combination should return its trackers ordered by category, then name."""
+        from journal_mcp.server import list_trackers
+        trackers = list_trackers(manager, category=category, include_deleted=include_deleted)
+        assert [tracker["name"] for tracker in trackers] == expected
+
+    def test_metadata_parsed(self, manager):
+        """meta_json should be returned as a parsed metadata dict."""
+        from journal_mcp.server import list_trackers
+        trackers = {tracker["id"]: tracker for tracker in list_trackers(manager)}
+        assert trackers["water"]["metadata"] == {"unit": "cups"}
+        assert "meta_json" not in trackers["water"]
+        assert trackers["run"]["deleted"] == 0
+
+
+@pytest.mark.unit
+class TestEnsureIndexes:
+    MCP_INDEXES = {"idx_entries_date", "idx_entries_tracker", "idx_trackers_category"}
+
+    def index_names(self, srv):
+        with srv.get_db() as conn:
+            return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+    def test_created_at_startup(self, srv, mcp_manager):
+        """With auto_index, the indexes should exist and be visible through the read-only pool."""
+        manager = mcp_manager(auto_index=True)
+        assert self.MCP_INDEXES <= self.index_names(srv)
+
+        pooled = manager.execute_safe_query("SELECT name FROM sqlite_master WHERE type = 'index'")
+        assert self.MCP_INDEXES <= {row["name"] for row in pooled}
+
+    def test_not_created_without_auto_index(self, srv, mcp_manager):
+        """With auto_index disabled, startup should leave the schema alone."""
+        before = self.index_names(srv)
+        mcp_manager(auto_index=False)
+        assert self.index_names(srv) == before
+        assert not {"idx_entries_tracker", "idx_trackers_category"} & before
+
+    def test_second_run_is_a_no_op(self, srv, mcp_manager):
+        """Starting again over an indexed database should not change the schema."""
+        mcp_manager(auto_index=True)
+        with srv.get_db() as conn:
+            version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        mcp_manager(auto_index=True)
+        with srv.get_db() as conn:
+            assert conn.execute("PRAGMA schema_version").fetchone()[0] == version
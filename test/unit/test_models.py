@@ -2,13 +2,42 @@
 import pytest
 from pydantic import ValidationError
 
+# Shared, read-only inputs; validation copies them, so tests can pass them as-is
+COMPLEX_DAYS = {
+    "2024-01-15": {
+        "tracker-1": {"value": 5, "completed": True},
+        "tracker-2": {"value": None, "completed": False}
+    },
+    "2024-01-16": {
+        "tracker-1": {"value": 3}
+    }
+}
+
+# (model name, required kwargs, expected defaults of the remaining fields)
+MODEL_DEFAULTS = [
+    ("TrackerConfig", {"id": "test", "name": "Test"}, {"category": "", "type": "simple"}),
+    ("TrackerEntry", {}, {"value": None, "completed": None}),
+    ("SyncPayload", {"clientId": "client-001"},
+     {"config": [], "days": {}, "operations": None, "lastSyncTime": None}),
+    ("StatusResponse", {}, {"lastModified": None}),
+    ("SyncResponse", {"success": True},
+     {"conflicts": [], "appliedConfig": [], "appliedDays": {}, "lastModified": None, "overwrittenData": []}),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("model_name,kwargs,expected", MODEL_DEFAULTS, ids=[case[0] for case in MODEL_DEFAULTS])
+def test_model_defaults(srv, model_name, kwargs, expected):
+    """Models should fill sensible defaults for every field not given."""
+    instance = getattr(srv, model_name)(**kwargs)
+    assert {field: getattr(instance, field) for field in expected} == expected
+
 
 @pytest.mark.unit
 class TestTrackerConfig:
-    def test_valid_tracker_config(self, test_app):
+    def test_valid_tracker_config(self, srv):
         """Valid tracker config should pass validation."""
-        import server
-        config = server.TrackerConfig(
+        config = srv.TrackerConfig(
             id="test-id",
             name="Test Tracker",
             category="health",
@@ -19,17 +48,9 @@ class TestTrackerConfig:
         assert config.category == "health"
         assert config.type == "simple"
 
-    def test_default_values(self, test_app):
-        """TrackerConfig should have sensible defaults."""
-        import server
-        config = server.TrackerConfig(id="test", name="Test")
-        assert config.category == ""
-        assert config.type == "simple"
-
-    def test_allows_extra_fields(self, test_app):
+    def test_allows_extra_fields(self, srv):
         """TrackerConfig should allow extra fields (for meta_json)."""
-        import server
-        config = server.TrackerConfig(
+        config = srv.TrackerConfig(
             id="test-id",
             name="Test",
             unit="cups",
@@ -40,42 +61,31 @@ class TestTrackerConfig:
         assert config.model_extra.get("unit") == "cups"
         assert config.model_extra.get("goal") == 8
 
-    def test_missing_id_raises(self, test_app):
+    def test_missing_id_raises(self, srv):
         """Missing id field should raise ValidationError."""
-        import server
-        with pytest.raises(ValidationError):
-            server.TrackerConfig(name="Test")
+        with pytest.raises(ValidationError, match=r"\nid\n  Field required"):
+            srv.TrackerConfig.model_validate({"name": "Test"})
 
-    def test_missing_name_raises(self, test_app):
+    def test_missing_name_raises(self, srv):
         """Missing name field should raise ValidationError."""
-        import server
-        with pytest.raises(ValidationError):
-            server.TrackerConfig(id="test")
+        with pytest.raises(ValidationError, match=r"\nname\n  Field required"):
+            srv.TrackerConfig.model_validate({"id": "test"})
 
 
 @pytest.mark.unit
 class TestTrackerEntry:
-    def test_valid_entry(self, test_app):
+    def test_valid_entry(self, srv):
         """Valid tracker entry should pass validation."""
-        import server
-        entry = server.TrackerEntry(value=5.0, completed=True)
+        entry = srv.TrackerEntry(value=5.0, completed=True)
         assert entry.value == 5.0
         assert entry.completed is True
 
-    def test_all_optional(self, test_app):
-        """All fields should be optional."""
-        import server
-        entry = server.TrackerEntry()
-        assert entry.value is None
-        assert entry.completed is None
-
 
 @pytest.mark.unit
 class TestSyncPayload:
-    def test_valid_sync_payload(self, test_app):
+    def test_valid_sync_payload(self, srv):
         """Valid sync payload should pass validation."""
-        import server
-        payload = server.SyncPayload(
+        payload = srv.SyncPayload(
             clientId="client-001",
             config=[],
             days={}
@@ -84,60 +94,38 @@ class TestSyncPayload:
         assert payload.config == []
         assert payload.days == {}
 
-    def test_default_values(self, test_app):
-        """SyncPayload should have sensible defaults."""
-        import server
-        payload = server.SyncPayload(clientId="client-001")
-        assert payload.config == []
-        assert payload.days == {}
-        assert payload.lastSyncTime is None
-
-    def test_missing_client_id_raises(self, test_app):
+    def test_missing_client_id_raises(self, srv):
         """Missing clientId should raise ValidationError."""
-        import server
-        with pytest.raises(ValidationError):
-            server.SyncPayload()
+        with pytest.raises(ValidationError, match=r"\nclientId\n  Field required"):
+            srv.SyncPayload.model_validate({})
 
-    def test_complex_days_structure(self, test_app):
+    def test_batch_config(self, srv):
+        """A sync payload with many trackers should validate in one call, keeping extra fields."""
+        raw = [{"id": f"t-{i}", "name": f"Tracker {i}", "unit": "cups"} for i in range(1000)]
+        payload = srv.SyncPayload.model_validate({"clientId": "client-001", "config": raw})
+        assert len(payload.config) == 1000
+        assert payload.config[-1] == {"id": "t-999", "name": "Tracker 999", "unit": "cups"}
+
+    def test_complex_days_structure(self, srv):
         """SyncPayload should accept complex days structure."""
-        import server
-        payload = server.SyncPayload(
-            clientId="client-001",
-            days={
-                "2024-01-15": {
-                    "tracker-1": {"value": 5, "completed": True},
-                    "tracker-2": {"value": None, "completed": False}
-                },
-                "2024-01-16": {
-                    "tracker-1": {"value": 3}
-                }
-            }
-        )
-        assert "2024-01-15" in payload.days
-        assert "tracker-1" in payload.days["2024-01-15"]
+        payload = srv.SyncPayload(clientId="client-001", days=COMPLEX_DAYS)
+        assert payload.days == COMPLEX_DAYS
+        assert payload.days is not COMPLEX_DAYS
 
 
 @pytest.mark.unit
 class TestStatusResponse:
-    def test_null_last_modified(self, test_app):
-        """StatusResponse should handle null lastModified."""
-        import server
-        response = server.StatusResponse()
-        assert response.lastModified is None
-
-    def test_with_timestamp(self, test_app):
+    def test_with_timestamp(self, srv):
         """StatusResponse should accept timestamp."""
-        import server
-        response = server.StatusResponse(lastModified="2024-01-15T10:30:00Z")
+        response = srv.StatusResponse(lastModified="2024-01-15T10:30:00Z")
         assert response.lastModified == "2024-01-15T10:30:00Z"
 
 
 @pytest.mark.unit
 class TestConflictInfo:
-    def test_valid_conflict_info(self, test_app):
+    def test_valid_conflict_info(self, srv):
         """Valid ConflictInfo should pass validation."""
-        import server
-        conflict = server.ConflictInfo(
+        conflict = srv.ConflictInfo(
             entityType="tracker",
             entityId="tracker-001",
             serverVersion=2,
@@ -151,10 +139,9 @@ class TestConflictInfo:
 
 @pytest.mark.unit
 class TestSyncResponse:
-    def test_successful_sync_response(self, test_app):
+    def test_successful_sync_response(self, srv):
         """SyncResponse should represent successful sync."""
-        import server
-        response = server.SyncResponse(
+        response = srv.SyncResponse(
             success=True,
             conflicts=[],
             appliedConfig=[{"id": "t1", "name": "Test"}],
@@ -164,12 +151,3 @@ class TestSyncResponse:
         assert response.success is True
         assert len(response.conflicts) == 0
         assert len(response.appliedConfig) == 1
-
-    def test_default_values(self, test_app):
-        """SyncResponse should have sensible defaults."""
-        import server
-        response = server.SyncResponse(success=True)
-        assert response.conflicts == []
-        assert response.appliedConfig == []
-        assert response.appliedDays == {}
-        assert response.overwrittenData == []